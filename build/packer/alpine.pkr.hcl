@@ -102,6 +102,12 @@ build {
     destination = "/opt/wifi-capture/"
   }
   
+  provisioner "shell" {
+    scripts = [
+      "scripts/prebuild.sh"
+    ]
+  }
+  
   post-processor "shell-local" {
     inline = ["echo 'Build complete! OVA exported to output/'"]
   }
@@ -20,14 +20,21 @@ pidfile="/run/wifi-capture.pid"
 output_log="/var/log/wifi-capture/app.log"
 error_log="/var/log/wifi-capture/error.log"
 
+extra_started_commands="ready"
+description_ready="Check whether the panel has finished startup (network + capture library)"
+
 depend() {
-    need net
-    after firewall
+    # 面板只依赖本地文件系统，先于网络启动；网络就绪由面板自身检测并通过 /api/ready 报告
+    need localmount
+    after bootmisc
+    before networking
 }
 
 start_pre() {
     checkpath --directory --owner root:root --mode 0755 /var/log/wifi-capture
     checkpath --directory --owner root:root --mode 0755 /opt/wifi-capture/captures
+    # 记录服务启动时刻（内核启动后的秒数），供启动时间跟踪使用
+    cut -d' ' -f1 /proc/uptime > /run/wifi-capture.boot
 }
 
 start() {
@@ -44,12 +51,21 @@ stop() {
     start-stop-daemon --stop --pidfile "$pidfile"
     eend $?
 }
+
+ready() {
+    ebegin "Checking WiFi Capture readiness"
+    wget -q -O - http://127.0.0.1:5000/api/ready
+    eend $?
+}
 INITEOF
 
 chmod +x /etc/init.d/wifi-capture
 
-# 启用开机自启
-rc-update add wifi-capture default
+# 启用开机自启：放在 boot 运行级，与网络配置并行启动，无需等待 default 运行级
+rc-update add wifi-capture boot
+
+# 并行启动 OpenRC 服务
+sed -i 's/^#\?rc_parallel=.*/rc_parallel="YES"/' /etc/rc.conf
 
 # 创建启动脚本（手动使用）
 cat > /opt/wifi-capture/start.sh << 'EOF'
@@ -83,6 +99,8 @@ cat > /etc/motd << 'EOF'
   
   手动启动: /opt/wifi-capture/start.sh
   手动停止: /opt/wifi-capture/stop.sh
+  就绪检查: rc-service wifi-capture ready
+  启动耗时: http://192.168.200.10:5000/api/debug/boot-trace
   
   ⚠️  仅用于测试自己的网络
 ═══════════════════════════════════════════════════════════
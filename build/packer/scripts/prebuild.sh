@@ -0,0 +1,23 @@
+#!/bin/sh
+# WiFi Capture - 预编译与预生成派生数据（在应用文件上传后执行）
+set -e
+
+echo "=========================================="
+echo "  WiFi Capture - 启动优化"
+echo "=========================================="
+
+cd /opt/wifi-capture/web
+
+# 预编译字节码，避免首次启动时编译模块
+echo "[*] 预编译 Python 字节码..."
+python3 -m compileall -q -j 0 /opt/wifi-capture/web
+
+# 预生成 OUI 索引，启动时无需解析 JSON
+echo "[*] 预生成 OUI 索引..."
+python3 /opt/wifi-capture/web/oui_database.py --build
+
+# 生成指纹化静态资源、预压缩版本与 Logo sprite
+echo "[*] 构建静态资源..."
+python3 /opt/wifi-capture/web/assets.py --build
+
+echo "[+] 启动优化完成"
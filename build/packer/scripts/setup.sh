@@ -31,7 +31,12 @@ echo "[*] 安装 Python 和 Flask..."
 apk add --no-cache \
     python3 \
     py3-pip \
-    py3-flask
+    py3-flask \
+    py3-numpy \
+    py3-msgpack
+
+# 可选：二进制 WebSocket 推送（失败时面板仍可通过 SSE 使用）
+pip3 install --no-cache-dir --break-system-packages flask-sock || echo "[-] flask-sock 安装失败，WebSocket 推送不可用"
 
 # 安装系统工具
 echo "[*] 安装系统工具..."
@@ -34,6 +34,10 @@ apk add --no-cache hcxtools hcxdumptool 2>/dev/null || echo "[!] hcxtools 不可
 echo "[*] 安装 Python 和 Flask..."
 apk add --no-cache python3 py3-pip py3-flask
 
+# 可选：二进制 WebSocket 推送（失败时面板仍可通过 SSE 使用）
+apk add --no-cache py3-msgpack 2>/dev/null || true
+pip3 install --no-cache-dir --break-system-packages flask-sock || echo "[-] flask-sock 安装失败，WebSocket 推送不可用"
+
 # 设置脚本权限
 chmod +x /home/vagrant/scripts/*.sh 2>/dev/null || true
 chmod +x /home/vagrant/web/*.py 2>/dev/null || true
@@ -8,14 +8,86 @@ import os
 
 from wifi_scanner import scanner
 from oui_database import oui_db
+from observations import OBSERVATION_FIELDS
+from exporter import EXPORT_FORMATS, is_format_available, stream_export
+from event_bus import (
+    event_bus,
+    LIBRARY_EVENTS,
+    EVENT_STATUS_CHANGED,
+    EVENT_NETWORKS_UPDATED,
+    EVENT_HIDDEN_SSID_FOUND,
+    EVENT_HANDSHAKE_CAPTURED,
+    EVENT_HISTORY_UPDATED,
+    EVENT_AUTO_CAPTURE_UPDATED,
+)
+from profiler import request_profiler, memory_tracker, PROFILE_MODES
+from logging_setup import log_buffer
+from boot_trace import boot_trace
+from frame_index import kind_matcher, FRAME_FILTERS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from pcap_reader import PcapError
+from capture_upload import UploadError
+from binary_codec import packb, KEY_DICTIONARY, CODEC_VERSION
+from resource_monitor import resource_sampler, prometheus_metrics
+
+try:
+    from flask_sock import Sock
+except ImportError:  # flask-sock 可选，缺失时不提供 WebSocket 推送，前端继续使用 SSE
+    Sock = None
 
 api_bp = Blueprint('api', __name__)
 
+# SSE 空闲时发送心跳的间隔（秒），保持连接不被代理断开
+STREAM_KEEPALIVE = 15
+LOG_QUERY_LIMIT = 1000  # /api/logs 单次返回的最大条数
+BOOTSTRAP_VERSION = 1   # /api/bootstrap 数据结构版本，字段不兼容变化时提升
+
+def _flag_arg(name):
+    """布尔查询参数：只有 true / 1 / yes 视为开启"""
+    return request.args.get(name, '').lower() in ('true', '1', 'yes')
+
+@api_bp.route('/health')
+def health():
+    """存活检查：进程能响应即返回 200，附带就绪状态"""
+    snapshot = boot_trace.snapshot()
+    return jsonify({'status': 'ok', 'ready': snapshot['ready'], 'checks': snapshot['checks']})
+
+@api_bp.route('/ready')
+def ready():
+    """就绪检查：网络与捕获库准备完成前返回 503"""
+    snapshot = boot_trace.snapshot()
+    return jsonify({'ready': snapshot['ready'], 'checks': snapshot['checks']}), 200 if snapshot['ready'] else 503
+
 @api_bp.route('/status')
 def get_status():
     """获取系统状态"""
     return jsonify(scanner.get_status())
 
+@api_bp.route('/bootstrap')
+def bootstrap():
+    """首屏所需的全部数据，一次返回
+
+    seq 在读取数据之前取得，之间发生的变化会在 /api/stream?since=seq&epoch=... 续传时
+    重放，因此快照与之后的增量推送不会有空档。
+    """
+    seq = event_bus.seq
+    networks = oui_db.enrich_networks(scanner.get_networks())
+    captures = scanner.get_captures()
+    response = jsonify({
+        'version': BOOTSTRAP_VERSION,
+        'epoch': event_bus.epoch,
+        'seq': seq,
+        'timestamp': time.time(),
+        'status': scanner.get_status(),
+        'auto_capture': scanner.get_auto_capture_status(),
+        'networks': networks,
+        'hidden_ssid_count': len(scanner.get_hidden_ssid_cache()),
+        'captures': captures,
+        'storage': scanner.content_store.stats(),
+        'transports': {'sse': True, 'ws': sock is not None}
+    })
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @api_bp.route('/scan', methods=['POST'])
 def start_scan():
     """开始扫描"""
@@ -46,6 +118,58 @@ def get_networks():
         'hidden_ssid_cache': hidden_cache
     })
 
+@api_bp.route('/spectrum')
+def get_spectrum():
+    """获取按信道/频段的占用统计"""
+    stats = scanner.spectrum.get_stats()
+    if _flag_arg('history'):
+        stats['history'] = scanner.spectrum.get_history(since=request.args.get('since', 0, type=float))
+    stats['is_scanning'] = scanner.is_scanning
+    return jsonify(stats)
+
+# ==================== 数据导出 ====================
+
+NETWORK_EXPORT_FIELDS = [
+    'bssid', 'essid', 'channel', 'power', 'encryption', 'cipher', 'auth',
+    'is_hidden', 'revealed', 'last_seen', 'attack_status', 'vendor'
+]
+
+def _export_response(rows, fields, name):
+    """以分块传输方式返回导出数据"""
+    format_type = request.args.get('format', 'csv')
+    if format_type not in EXPORT_FORMATS:
+        return jsonify({'error': f'不支持的导出格式: {format_type}'}), 400
+    if not is_format_available(format_type):
+        return jsonify({'error': f'{format_type} 导出需要安装 pyarrow'}), 400
+    
+    info = EXPORT_FORMATS[format_type]
+    filename = f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.{info['extension']}"
+    return Response(
+        stream_export(rows, fields, format_type),
+        mimetype=info['mimetype'],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+def _with_vendor(rows):
+    for row in rows:
+        row['vendor'] = oui_db.get_vendor_name(row.get('bssid', ''))
+        yield row
+
+@api_bp.route('/export/networks')
+def export_networks():
+    """导出当前网络列表（附带厂商信息）"""
+    return _export_response(_with_vendor(scanner.get_networks()), NETWORK_EXPORT_FIELDS, 'networks')
+
+@api_bp.route('/export/observations')
+def export_observations():
+    """流式导出每个 BSSID 的观测历史，可按 since/until/bssid 过滤"""
+    rows = scanner.observations.iter_observations(
+        since=request.args.get('since', type=float),
+        until=request.args.get('until', type=float),
+        bssid=request.args.get('bssid')
+    )
+    return _export_response(_with_vendor(rows), OBSERVATION_FIELDS + ['vendor'], 'observations')
+
 @api_bp.route('/capture', methods=['POST'])
 def start_capture():
     """开始捕获"""
@@ -95,7 +219,8 @@ def get_captures():
     captures = scanner.get_captures()
     return jsonify({
         'captures': captures,
-        'count': len(captures)
+        'count': len(captures),
+        'storage': scanner.content_store.stats()
     })
 
 @api_bp.route('/captures/download/<filename>')
@@ -127,6 +252,42 @@ def download_capture(filename):
     else:
         return jsonify({'error': f'无法转换为 {format_type} 格式'}), 400
 
+@api_bp.route('/captures/<filename>/frames')
+def get_capture_frames(filename):
+    """分页浏览捕获文件中的帧摘要，下一页传入上次返回的 next_cursor
+
+    过滤参数: type=mgmt,ctrl,data,eapol  subtype=beacon,probe_resp,...
+    """
+    cap_path = scanner.capture_dir / filename
+    if not scanner.capture_watcher.is_capture_file(filename) or not cap_path.exists():
+        return jsonify({'error': '文件不存在'}), 404
+    
+    types = {t for t in request.args.get('type', '').split(',') if t}
+    unknown = types - set(FRAME_FILTERS)
+    if unknown:
+        return jsonify({'error': f"不支持的帧类型: {', '.join(sorted(unknown))}"}), 400
+    subtypes = {t for t in request.args.get('subtype', '').split(',') if t}
+    cursor = max(request.args.get('cursor', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    
+    try:
+        with scanner.frame_index.open(cap_path) as index:
+            numbers, next_cursor = index.find(cursor, limit, kind_matcher(types, subtypes))
+            frames = index.summaries(numbers)
+            total, truncated = index.count, index.truncated
+    except FileNotFoundError:
+        return jsonify({'error': '文件不存在'}), 404
+    except PcapError as e:
+        return jsonify({'error': f'无法读取捕获文件: {e}'}), 422
+    
+    return jsonify({
+        'filename': filename,
+        'total': total,
+        'truncated': truncated,
+        'frames': frames,
+        'next_cursor': next_cursor
+    })
+
 @api_bp.route('/captures/convert/<filename>', methods=['POST'])
 def convert_capture(filename):
     """转换捕获文件格式"""
@@ -156,6 +317,58 @@ def delete_capture(filename):
     else:
         return jsonify({'success': False, 'message': '删除失败'}), 400
 
+# ==================== 捕获文件导入 ====================
+
+def _upload_error(e):
+    body = {'success': False, 'message': str(e)}
+    if e.offset is not None:
+        body['offset'] = e.offset
+    return jsonify(body), e.status
+
+@api_bp.route('/uploads', methods=['POST'])
+def create_upload():
+    """登记一次分块上传: {"filename": "...", "size": 字节数}"""
+    data = request.json or {}
+    try:
+        upload = scanner.uploads.create(data.get('filename'), data.get('size'))
+    except UploadError as e:
+        return _upload_error(e)
+    return jsonify({'success': True, **upload}), 201
+
+@api_bp.route('/uploads')
+def list_uploads():
+    """未完成的上传"""
+    return jsonify({'uploads': scanner.uploads.list_uploads()})
+
+@api_bp.route('/uploads/<upload_id>')
+def get_upload(upload_id):
+    """查询已接收的字节数，断线后从 offset 续传"""
+    try:
+        return jsonify(scanner.uploads.status(upload_id))
+    except UploadError as e:
+        return _upload_error(e)
+
+@api_bp.route('/uploads/<upload_id>', methods=['PATCH'])
+def upload_chunk(upload_id):
+    """写入一个分块，请求体为原始数据，Upload-Offset 头为分块的起始偏移"""
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None:
+        return jsonify({'success': False, 'message': '缺少 Upload-Offset 头'}), 400
+    try:
+        upload = scanner.uploads.write_chunk(upload_id, offset, request.stream)
+    except UploadError as e:
+        return _upload_error(e)
+    return jsonify({'success': True, **upload})
+
+@api_bp.route('/uploads/<upload_id>', methods=['DELETE'])
+def cancel_upload(upload_id):
+    """取消上传并删除已接收的数据"""
+    try:
+        scanner.uploads.cancel(upload_id)
+    except UploadError as e:
+        return _upload_error(e)
+    return jsonify({'success': True})
+
 @api_bp.route('/cleanup', methods=['POST'])
 def cleanup_files():
     """清理旧文件"""
@@ -237,28 +450,148 @@ def clear_attack_history():
     scanner.clear_attack_history()
     return jsonify({'success': True, 'message': '攻击历史已清除'})
 
+# ==================== 调试 / 性能分析 ====================
+
+@api_bp.route('/debug/profiling')
+def get_profiling():
+    """获取分析开关状态与最近的分析报告"""
+    return jsonify({
+        'enabled': request_profiler.enabled,
+        'mode': request_profiler.mode,
+        'reports': request_profiler.list_reports()
+    })
+
+@api_bp.route('/debug/profiling', methods=['POST'])
+def set_profiling():
+    """开启/关闭全部请求的分析"""
+    data = request.json or {}
+    mode = data.get('mode')
+    if mode is not None and mode not in PROFILE_MODES:
+        return jsonify({'success': False, 'message': f'不支持的分析模式: {mode}'}), 400
+    
+    request_profiler.set_enabled(data.get('enabled', True), mode)
+    return jsonify({
+        'success': True,
+        'enabled': request_profiler.enabled,
+        'mode': request_profiler.mode
+    })
+
+@api_bp.route('/debug/profiles/<report_id>')
+def get_profile_report(report_id):
+    """获取分析报告 - 默认返回 flamegraph 折叠栈文本"""
+    report = request_profiler.get_report(report_id)
+    if not report:
+        return jsonify({'error': '报告不存在'}), 404
+    
+    if request.args.get('format') == 'json':
+        return jsonify(report)
+    return Response(report['collapsed'] + '\n', mimetype='text/plain')
+
+@api_bp.route('/debug/slow-requests')
+def get_slow_requests():
+    """获取慢请求日志"""
+    slow_requests = request_profiler.get_slow_requests()
+    return jsonify({
+        'requests': slow_requests,
+        'count': len(slow_requests)
+    })
+
+@api_bp.route('/debug/tracemalloc', methods=['POST'])
+def control_tracemalloc():
+    """启动/停止 tracemalloc"""
+    data = request.json or {}
+    action = data.get('action', 'start')
+    
+    if action == 'start':
+        memory_tracker.start(nframes=data.get('nframes', 10))
+    elif action == 'stop':
+        memory_tracker.stop()
+    else:
+        return jsonify({'success': False, 'message': f'未知操作: {action}'}), 400
+    
+    return jsonify({'success': True, 'tracing': memory_tracker.is_tracing})
+
+@api_bp.route('/debug/tracemalloc')
+def get_tracemalloc_snapshot():
+    """拍摄内存快照，并与上一次快照比较"""
+    limit = request.args.get('limit', 20, type=int)
+    result = memory_tracker.snapshot(limit=limit)
+    if result is None:
+        return jsonify({'success': False, 'message': 'tracemalloc 未启动'}), 400
+    return jsonify({'success': True, **result})
+
+@api_bp.route('/resources')
+def get_resources():
+    """面板与子进程的资源占用：最近一次采样、已退出进程汇总，可选历史序列"""
+    result = resource_sampler.get_current()
+    if _flag_arg('history'):
+        result['history'] = resource_sampler.get_history(
+            since=request.args.get('since', 0, type=float),
+            name=request.args.get('name')
+        )
+    return jsonify(result)
+
+@api_bp.route('/metrics')
+def get_metrics():
+    """Prometheus 文本格式的资源指标"""
+    return Response(prometheus_metrics(resource_sampler), mimetype='text/plain; version=0.0.4')
+
 @api_bp.route('/stream')
 def event_stream():
-    """SSE 实时事件流"""
+    """SSE 实时事件流 - 由事件总线唤醒推送，空闲时只发送心跳
+
+    捕获库的增量变化以命名事件 (capture_added 等) 单独推送，
+    其余变化推送完整状态快照。每条消息的 id 为事件序号。
+
+    since/epoch（来自 /api/bootstrap 或上次收到的 id）: 从该序号之后续传，
+    不再推送首个快照；序号已失效时先推送 resync 事件，客户端应重新获取 bootstrap。
+    """
+    since = request.args.get('since', type=int)
+    epoch = request.args.get('epoch')
+    
     def generate():
+        seq = event_bus.seq
+        events = []
+        snapshot = True
+        if since is not None:
+            if epoch == event_bus.epoch and event_bus.has_history(since):
+                seq, events = event_bus.wait(since, timeout=0, coalesce=0)
+                snapshot = False
+            else:
+                yield f"event: resync\ndata: {json.dumps({'epoch': event_bus.epoch, 'seq': seq})}\n\n"
         while True:
-            status = scanner.get_status()
-            networks = scanner.get_networks()
-            networks = oui_db.enrich_networks(networks)
-            
-            hidden_cache = scanner.get_hidden_ssid_cache()
-            auto_capture_status = scanner.get_auto_capture_status()
+            state_events = []
+            for event in events:
+                if event['type'] in LIBRARY_EVENTS:
+                    yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+                else:
+                    state_events.append(event['type'])
             
-            data = {
-                'status': status,
-                'networks': networks[:30],  # 发送前 30 个
-                'timestamp': time.time(),
-                'hidden_ssid_count': len(hidden_cache),
-                'auto_capture': auto_capture_status
-            }
+            # 首次连接或状态有变化时推送快照
+            if snapshot or state_events:
+                snapshot = False
+                status = scanner.get_status()
+                networks = scanner.get_networks()
+                networks = oui_db.enrich_networks(networks)
+                
+                hidden_cache = scanner.get_hidden_ssid_cache()
+                auto_capture_status = scanner.get_auto_capture_status()
+                
+                data = {
+                    'status': status,
+                    'networks': networks[:30],  # 发送前 30 个
+                    'timestamp': time.time(),
+                    'hidden_ssid_count': len(hidden_cache),
+                    'auto_capture': auto_capture_status,
+                    'events': state_events
+                }
+                
+                yield f"id: {seq}\ndata: {json.dumps(data)}\n\n"
             
-            yield f"data: {json.dumps(data)}\n\n"
-            time.sleep(2)
+            seq, events = event_bus.wait(seq, timeout=STREAM_KEEPALIVE)
+            while not events:
+                yield ": keepalive\n\n"
+                seq, events = event_bus.wait(seq, timeout=STREAM_KEEPALIVE)
     
     return Response(
         generate(),
@@ -269,3 +602,154 @@ def event_stream():
             'X-Accel-Buffering': 'no'
         }
     )
+
+# ==================== 二进制 WebSocket 推送 ====================
+
+WS_TOPICS = ('status', 'networks', 'captures')
+WS_POLL_INTERVAL = 1      # 检查客户端订阅变化的间隔（秒），事件推送不受影响
+WS_NETWORK_PAGE = 30
+WS_MAX_NETWORK_PAGE = 500
+# 各主题在哪些事件发生后需要重新推送
+WS_TOPIC_EVENTS = {
+    'status': {EVENT_STATUS_CHANGED, EVENT_HANDSHAKE_CAPTURED, EVENT_AUTO_CAPTURE_UPDATED, EVENT_HIDDEN_SSID_FOUND},
+    'networks': {EVENT_NETWORKS_UPDATED, EVENT_HIDDEN_SSID_FOUND, EVENT_HISTORY_UPDATED},
+}
+
+sock = Sock() if Sock is not None else None
+
+def _ws_subscription(params, current=None):
+    """解析订阅参数: topics、networks 分页 offset/limit"""
+    sub = dict(current or {'topics': set(WS_TOPICS), 'offset': 0, 'limit': WS_NETWORK_PAGE})
+    topics = params.get('topics')
+    if isinstance(topics, str):
+        topics = topics.split(',')
+    if topics is not None:
+        sub['topics'] = {t for t in topics if t in WS_TOPICS}
+    try:
+        sub['offset'] = max(int(params.get('offset', sub['offset'])), 0)
+        sub['limit'] = min(max(int(params.get('limit', sub['limit'])), 1), WS_MAX_NETWORK_PAGE)
+    except (TypeError, ValueError):
+        pass
+    return sub
+
+def _ws_topic_message(topic, sub):
+    if topic == 'status':
+        return {
+            't': 'status',
+            'status': scanner.get_status(),
+            'auto_capture': scanner.get_auto_capture_status(),
+            'hidden_ssid_count': len(scanner.get_hidden_ssid_cache())
+        }
+    networks = scanner.get_networks()
+    page = oui_db.enrich_networks(networks[sub['offset']:sub['offset'] + sub['limit']])
+    return {'t': 'networks', 'total': len(networks), 'offset': sub['offset'], 'limit': sub['limit'], 'items': page}
+
+if sock is not None:
+    @sock.route('/ws', bp=api_bp)
+    def ws_stream(ws):
+        """二进制 WebSocket 推送：MessagePack 编码、键名字典压缩，可按主题订阅
+
+        连接参数或客户端发送的 JSON 文本消息: {"topics": [...], "offset": 0, "limit": 30}
+        压缩 (permessage-deflate) 在客户端请求时自动协商。
+        since/epoch 与 /api/stream 相同：从该序号之后续传，序号失效时先发送 resync。
+        """
+        sub = _ws_subscription(request.args)
+        ws.send(packb({
+            't': 'hello',
+            'v': CODEC_VERSION,
+            'keys': KEY_DICTIONARY,
+            'topics': sorted(sub['topics'])
+        }, compact=False))
+        
+        seq = event_bus.seq
+        pending = set(sub['topics'])
+        events = []
+        since = request.args.get('since', type=int)
+        if since is not None:
+            if request.args.get('epoch') == event_bus.epoch and event_bus.has_history(since):
+                seq, events = event_bus.wait(since, timeout=0, coalesce=0)
+                changed = {e['type'] for e in events}
+                pending = {topic for topic, types in WS_TOPIC_EVENTS.items() if changed & types}
+            else:
+                ws.send(packb({'t': 'resync', 'seq': seq}))
+        while ws.connected:
+            if 'captures' in sub['topics']:
+                for event in events:
+                    if event['type'] in LIBRARY_EVENTS:
+                        ws.send(packb({'t': 'capture', 'type': event['type'], 'data': event['data'],
+                                       'seq': event['seq']}))
+            for topic in ('status', 'networks'):
+                if topic in pending and topic in sub['topics']:
+                    ws.send(packb(dict(_ws_topic_message(topic, sub), seq=seq)))
+            
+            seq, events = event_bus.wait(seq, timeout=WS_POLL_INTERVAL)
+            changed = {e['type'] for e in events}
+            pending = {topic for topic, types in WS_TOPIC_EVENTS.items() if changed & types}
+            
+            # 处理客户端的订阅变更
+            while True:
+                message = ws.receive(timeout=0)
+                if message is None:
+                    break
+                try:
+                    params = json.loads(message)
+                except (TypeError, ValueError):
+                    continue
+                if not isinstance(params, dict):
+                    continue
+                new_sub = _ws_subscription(params, sub)
+                pending |= new_sub['topics'] - sub['topics']
+                if (new_sub['offset'], new_sub['limit']) != (sub['offset'], sub['limit']):
+                    pending.add('networks')
+                sub = new_sub
+
+@api_bp.route('/logs')
+def get_logs():
+    """查询最近的日志，支持按级别 / 时间 / 序号 / 模块过滤"""
+    limit = min(request.args.get('limit', 200, type=int), LOG_QUERY_LIMIT)
+    records = log_buffer.query(
+        level=request.args.get('level'),
+        since=request.args.get('since', type=float),
+        after_seq=request.args.get('after_seq', type=int),
+        logger=request.args.get('logger'),
+        limit=limit
+    )
+    return jsonify({'logs': records, 'seq': log_buffer.seq})
+
+@api_bp.route('/logs/stream')
+def log_stream():
+    """SSE 实时跟踪日志，断线重连时通过 Last-Event-ID 续传"""
+    level = request.args.get('level')
+    logger_name = request.args.get('logger')
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('after_seq')
+    try:
+        after_seq = int(last_id)
+    except (TypeError, ValueError):
+        after_seq = log_buffer.seq
+
+    def generate():
+        seq = after_seq
+        while True:
+            latest = log_buffer.wait(seq, timeout=STREAM_KEEPALIVE)
+            if latest <= seq:
+                yield ": keepalive\n\n"
+                continue
+            records = log_buffer.query(level=level, after_seq=seq, logger=logger_name, limit=0)
+            for record in records:
+                yield f"id: {record['seq']}\ndata: {json.dumps(record, ensure_ascii=False, default=str)}\n\n"
+            seq = max(latest, records[-1]['seq']) if records else latest
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'Connection': 'keep-alive',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@api_bp.route('/debug/boot-trace')
+def get_boot_trace():
+    """本次与最近几次启动的各阶段时刻（内核启动后的秒数）"""
+    return jsonify({'current': boot_trace.snapshot(), 'history': boot_trace.load_history()})
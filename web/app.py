@@ -4,14 +4,40 @@
 from flask import Flask, render_template, send_from_directory
 import os
 import atexit
+import threading
+
+# 日志需在导入扫描器等模块前配置，确保启动阶段的记录也进入队列
+from logging_setup import setup_logging, shutdown_logging
+setup_logging()
+
+from boot_trace import boot_trace, MARK_APP_LOADED, MARK_LISTENING, MARK_FIRST_RESPONSE
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.urandom(24)
+# WebSocket 推送（flask-sock）空闲时的 ping 间隔
+app.config['SOCK_SERVER_OPTIONS'] = {'ping_interval': 25}
 
 # 导入并注册 API 蓝图
 from api import api_bp
 app.register_blueprint(api_bp, url_prefix='/api')
 
+# 请求级性能分析与慢请求日志
+from profiler import request_profiler
+request_profiler.init_app(app)
+
+# 指纹化静态资源、Logo sprite 与 JSON 响应压缩
+from assets import asset_pipeline
+asset_pipeline.init_app(app)
+
+boot_trace.mark(MARK_APP_LOADED)
+
+@app.after_request
+def record_first_response(response):
+    """记录开机后第一个成功响应的时刻"""
+    if response.status_code == 200 and not boot_trace.has_mark(MARK_FIRST_RESPONSE):
+        boot_trace.mark(MARK_FIRST_RESPONSE)
+    return response
+
 @app.route('/')
 def index():
     """主页"""
@@ -28,6 +54,9 @@ def download_capture(filename):
     capture_dir = os.environ.get('CAPTURE_DIR', '/home/vagrant/captures')
     return send_from_directory(capture_dir, filename, as_attachment=True)
 
+# atexit 逆序执行，日志线程在扫描器清理之后才停止
+atexit.register(shutdown_logging)
+
 # 清理函数
 def cleanup():
     from wifi_scanner import scanner
@@ -35,5 +64,19 @@ def cleanup():
 
 atexit.register(cleanup)
 
+def warm_up():
+    """后台完成启动准备，面板无需等待即可响应"""
+    from wifi_scanner import scanner
+    from resource_monitor import resource_sampler
+    resource_sampler.start()
+    # 监听捕获目录，增量维护捕获库并推送变化
+    scanner.capture_watcher.start()
+    scanner.content_store.deduplicate_all()
+    boot_trace.set_check('capture_library')
+
 if __name__ == '__main__':
+    boot_trace.require('capture_library')
+    boot_trace.watch_network()
+    threading.Thread(target=warm_up, daemon=True).start()
+    boot_trace.mark(MARK_LISTENING)
     app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Asset Pipeline - 静态资源指纹化、预压缩、厂商 Logo 合并为 SVG sprite，以及 JSON 响应压缩"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import sys
+from pathlib import Path
+
+from flask import request, send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.utils import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli 可选，缺失时只生成 gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).parent / 'static'
+DIST_DIR_NAME = 'dist'                  # 构建输出目录（位于 static 下）
+MANIFEST_FILE = 'manifest.json'
+SOURCE_ASSETS = ('css/style.css', 'js/app.js', 'js/state-worker.js')
+LOGO_DIR_NAME = 'logos'
+SPRITE_ASSET = 'logos/sprite.svg'       # 由 logos/*.svg 生成，不存在于源码目录
+ASSET_URL_PREFIX = '/assets/'
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+PRECOMPRESS_MIN_SIZE = 512              # 小于此大小的资源不预压缩
+COMPRESS_MIN_SIZE = 1024                # JSON 响应超过此大小时实时压缩
+COMPRESS_LEVEL_GZIP = 6
+COMPRESS_QUALITY_BROTLI = 5
+
+# 预压缩文件后缀，按优先级排列
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_SVG_RE = re.compile(r'<svg\b([^>]*)>(.*)</svg>', re.S)
+_VIEWBOX_RE = re.compile(r'viewBox="([^"]*)"')
+
+
+def build_logo_sprite(logo_dir):
+    """把每个 Logo 转为 <symbol id="logo-名称">，合并为一个 SVG"""
+    symbols = []
+    for path in sorted(Path(logo_dir).glob('*.svg')):
+        if path.name == Path(SPRITE_ASSET).name:
+            continue
+        match = _SVG_RE.search(path.read_text(encoding='utf-8'))
+        if not match:
+            logger.warning("无法解析 Logo: %s", path.name)
+            continue
+        viewbox = _VIEWBOX_RE.search(match.group(1))
+        viewbox_attr = f' viewBox="{viewbox.group(1)}"' if viewbox else ''
+        symbols.append(f'<symbol id="logo-{path.stem}"{viewbox_attr}>{match.group(2).strip()}</symbol>')
+    return '<svg xmlns="http://www.w3.org/2000/svg">' + ''.join(symbols) + '</svg>\n'
+
+
+def _compress(data, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level or 11)
+    return gzip.compress(data, compresslevel=level or 9, mtime=0)
+
+
+def _accepted_encoding():
+    """根据 Accept-Encoding 选择编码，优先 brotli"""
+    for encoding, _ in ENCODINGS:
+        if encoding == 'br' and brotli is None:
+            continue
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+class AssetPipeline:
+    def __init__(self, static_dir=STATIC_DIR):
+        self.static_dir = Path(static_dir)
+        self.dist_dir = self.static_dir / DIST_DIR_NAME
+        self.manifest = {}
+        self.logos = []
+
+    # ==================== 构建 ====================
+
+    def _source_logos(self):
+        return sorted(p.stem for p in (self.static_dir / LOGO_DIR_NAME).glob('*.svg'))
+
+    def _sources(self):
+        """逻辑路径 -> 源内容"""
+        sources = {path: (self.static_dir / path).read_bytes() for path in SOURCE_ASSETS}
+        sources[SPRITE_ASSET] = build_logo_sprite(self.static_dir / LOGO_DIR_NAME).encode('utf-8')
+        return sources
+
+    @staticmethod
+    def _source_hash(sources):
+        digest = hashlib.sha256()
+        for path in sorted(sources):
+            digest.update(path.encode('utf-8') + b'\0' + sources[path])
+        return digest.hexdigest()
+
+    def build(self):
+        """生成指纹文件与 .gz/.br 预压缩版本，清理旧版本，写出清单"""
+        sources = self._sources()
+        self.dist_dir.mkdir(parents=True, exist_ok=True)
+
+        files = {}
+        outputs = set()
+        for path, data in sources.items():
+            stem, ext = os.path.splitext(os.path.basename(path))
+            name = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+            variants = {name: data}
+            if len(data) >= PRECOMPRESS_MIN_SIZE:
+                variants[name + '.gz'] = _compress(data, 'gzip')
+                if brotli is not None:
+                    variants[name + '.br'] = _compress(data, 'br')
+            for variant, content in variants.items():
+                target = self.dist_dir / variant
+                if not target.exists():
+                    tmp_path = target.with_name(target.name + '.tmp')
+                    tmp_path.write_bytes(content)
+                    os.replace(tmp_path, target)
+                outputs.add(variant)
+            files[path] = name
+
+        manifest = {
+            'source_hash': self._source_hash(sources),
+            'files': files,
+            'logos': self._source_logos()
+        }
+        tmp_path = self.dist_dir / (MANIFEST_FILE + '.tmp')
+        tmp_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        os.replace(tmp_path, self.dist_dir / MANIFEST_FILE)
+
+        for f in self.dist_dir.iterdir():
+            if f.name != MANIFEST_FILE and f.name not in outputs:
+                f.unlink()
+
+        self._apply_manifest(manifest)
+        logger.info("静态资源已构建: %s", ', '.join(files.values()))
+        return manifest
+
+    def _apply_manifest(self, manifest):
+        self.manifest = manifest['files']
+        self.logos = manifest['logos']
+
+    def load(self):
+        """加载清单；清单缺失或源文件已变化时重新构建"""
+        try:
+            manifest = json.loads((self.dist_dir / MANIFEST_FILE).read_text(encoding='utf-8'))
+            if manifest.get('source_hash') == self._source_hash(self._sources()):
+                self._apply_manifest(manifest)
+                return
+        except (OSError, ValueError):
+            pass
+        try:
+            self.build()
+        except OSError as e:
+            logger.warning("静态资源构建失败，使用未指纹化的文件: %s", e)
+            self.logos = self._source_logos()
+
+    # ==================== 运行时 ====================
+
+    def init_app(self, app):
+        """注册资源路由、模板函数与 JSON 压缩钩子"""
+        self.load()
+        app.add_url_rule(ASSET_URL_PREFIX + '<path:filename>', 'assets', self.serve_asset)
+        app.context_processor(lambda: {'asset_url': self.asset_url, 'logo_names': self.logos})
+        app.after_request(self.compress_response)
+
+    def asset_url(self, path):
+        """逻辑路径 -> 带指纹的 URL；未构建时回退到原始静态文件，sprite 没有源文件时返回空字符串"""
+        name = self.manifest.get(path)
+        if name:
+            return ASSET_URL_PREFIX + name
+        if path == SPRITE_ASSET:
+            return ''
+        return '/static/' + path
+
+    def serve_asset(self, filename):
+        """提供指纹文件，按 Accept-Encoding 选择预压缩版本"""
+        path = safe_join(str(self.dist_dir), filename)
+        if path is None or not os.path.isfile(path):
+            raise NotFound()
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        encoding = _accepted_encoding()
+        if encoding and os.path.isfile(path + dict(ENCODINGS)[encoding]):
+            response = send_file(path + dict(ENCODINGS)[encoding], mimetype=mimetype, conditional=True)
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response = send_file(path, mimetype=mimetype, conditional=True)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def compress_response(self, response):
+        """较大的 JSON 响应实时压缩"""
+        if (response.mimetype != 'application/json'
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.status_code < 200 or response.status_code in (204, 304)):
+            return response
+
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        encoding = _accepted_encoding()
+        if not encoding:
+            return response
+
+        level = COMPRESS_QUALITY_BROTLI if encoding == 'br' else COMPRESS_LEVEL_GZIP
+        response.set_data(_compress(data, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+
+
+# 全局实例
+asset_pipeline = AssetPipeline()
+
+
+if __name__ == '__main__':
+    # 镜像构建时预生成: python3 assets.py --build
+    if '--build' in sys.argv[1:]:
+        logging.basicConfig(level=logging.INFO)
+        asset_pipeline.build()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Binary Codec - WebSocket 推送使用的 MessagePack 编码与键名字典"""
+
+import struct
+
+try:
+    import msgpack
+except ImportError:  # msgpack 可选，缺失时使用下面的纯 Python 编码
+    msgpack = None
+
+CODEC_VERSION = 1
+
+# 高频键名 -> 整数下标，客户端解码时按下标还原；只能在末尾追加，修改需提升 CODEC_VERSION
+KEY_DICTIONARY = [
+    't', 'bssid', 'essid', 'channel', 'power', 'encryption', 'cipher', 'auth',
+    'clients', 'last_seen', 'is_hidden', 'revealed', 'attack_status', 'attack_time',
+    'has_handshake', 'vendor', 'logo', 'stale', 'status', 'networks', 'items', 'total',
+    'offset', 'limit', 'type', 'data', 'capture', 'filename', 'format', 'size', 'mtime',
+    'created', 'available_formats', 'supported_formats', 'compaction', 'path',
+    'interface', 'mon_interface', 'is_scanning', 'is_capturing', 'current_target',
+    'network_count', 'attack_running', 'attack_type', 'attack_count', 'restored_at',
+    'auto_capture', 'hidden_ssid_count', 'timestamp', 'events', 'seq', 'sha256',
+    'duplicate_of', 'handshake', 'progress', 'completed', 'captured', 'failed',
+]
+_KEY_INDEX = {key: i for i, key in enumerate(KEY_DICTIONARY)}
+
+
+def compact_keys(obj):
+    """把字典中在键名字典里的键替换为整数下标"""
+    if isinstance(obj, dict):
+        return {_KEY_INDEX.get(k, k): compact_keys(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [compact_keys(v) for v in obj]
+    return obj
+
+
+def _pack_int(n, out):
+    if 0 <= n < 0x80:
+        out.append(n)
+    elif -0x20 <= n < 0:
+        out.append(n & 0xff)
+    elif 0 <= n <= 0xff:
+        out += b'\xcc' + struct.pack('>B', n)
+    elif 0 <= n <= 0xffff:
+        out += b'\xcd' + struct.pack('>H', n)
+    elif 0 <= n <= 0xffffffff:
+        out += b'\xce' + struct.pack('>I', n)
+    elif 0 <= n <= 0xffffffffffffffff:
+        out += b'\xcf' + struct.pack('>Q', n)
+    elif -0x80 <= n:
+        out += b'\xd0' + struct.pack('>b', n)
+    elif -0x8000 <= n:
+        out += b'\xd1' + struct.pack('>h', n)
+    elif -0x80000000 <= n:
+        out += b'\xd2' + struct.pack('>i', n)
+    elif -0x8000000000000000 <= n:
+        out += b'\xd3' + struct.pack('>q', n)
+    else:
+        raise OverflowError('整数超出 MessagePack 范围')
+
+
+def _pack_length(n, fix_tag, fix_max, tags, out):
+    if n <= fix_max:
+        out.append(fix_tag | n)
+    elif len(tags) == 3 and n <= 0xff:
+        out += tags[0] + struct.pack('>B', n)
+    elif n <= 0xffff:
+        out += tags[-2] + struct.pack('>H', n)
+    else:
+        out += tags[-1] + struct.pack('>I', n)
+
+
+def _pack(obj, out):
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, float):
+        out += b'\xcb' + struct.pack('>d', obj)
+    elif isinstance(obj, str):
+        raw = obj.encode('utf-8')
+        _pack_length(len(raw), 0xa0, 31, (b'\xd9', b'\xda', b'\xdb'), out)
+        out += raw
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        if n <= 0xff:
+            out += b'\xc4' + struct.pack('>B', n)
+        elif n <= 0xffff:
+            out += b'\xc5' + struct.pack('>H', n)
+        else:
+            out += b'\xc6' + struct.pack('>I', n)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        _pack_length(len(obj), 0x90, 15, (b'\xdc', b'\xdd'), out)
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        _pack_length(len(obj), 0x80, 15, (b'\xde', b'\xdf'), out)
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        _pack(str(obj), out)
+
+
+def packb(obj, compact=True):
+    """编码为 MessagePack；compact 时先按键名字典压缩键名"""
+    if compact:
+        obj = compact_keys(obj)
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True, default=str)
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Boot Trace - 记录从内核启动到面板可用/就绪的各阶段时刻，跟踪虚拟机启动耗时"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BOOT_TRACE_FILE = '/opt/wifi-capture/data/boot_trace.json'
+SERVICE_START_FILE = '/run/wifi-capture.boot'  # OpenRC start_pre 写入的服务启动时刻（/proc/uptime）
+MAX_BOOT_RECORDS = 20                          # 保留最近几次启动的记录
+NETWORK_POLL_INTERVAL = 0.5
+NETWORK_WAIT_TIMEOUT = 300
+
+# 阶段时刻均为内核启动后的秒数（CLOCK_BOOTTIME），内核启动即 0
+MARK_SERVICE_START = 'service_start'
+MARK_PROCESS_START = 'process_start'
+MARK_APP_LOADED = 'app_loaded'
+MARK_LISTENING = 'listening'
+MARK_FIRST_RESPONSE = 'first_response'
+MARK_READY = 'ready'
+
+
+def boot_uptime():
+    """内核启动后经过的秒数"""
+    try:
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+    except (AttributeError, OSError):
+        return time.monotonic()
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _process_start_uptime():
+    """本进程的启动时刻，包含解释器自身的启动耗时"""
+    stat = _read_text('/proc/self/stat')
+    if not stat:
+        return None
+    try:
+        # comm 字段可能含空格，从最后一个 ')' 之后开始数；starttime 为第 22 个字段
+        fields = stat[stat.rindex(')') + 2:].split()
+        return int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (ValueError, IndexError, OSError):
+        return None
+
+
+def network_is_up():
+    """除回环外是否有网卡已启用"""
+    try:
+        for name in os.listdir('/sys/class/net'):
+            if name != 'lo' and _read_text(f'/sys/class/net/{name}/operstate') == 'up':
+                return True
+    except OSError:
+        pass
+    return False
+
+
+class BootTrace:
+    def __init__(self, trace_file=BOOT_TRACE_FILE):
+        self.trace_file = Path(trace_file)
+        self._lock = threading.Lock()
+        self.boot_id = _read_text('/proc/sys/kernel/random/boot_id')
+        self.marks = {}
+        self.checks = {}  # 就绪检查项 -> 是否通过
+
+        service_start = _read_text(SERVICE_START_FILE)
+        if service_start:
+            try:
+                self.marks[MARK_SERVICE_START] = round(float(service_start.split()[0]), 3)
+            except ValueError:
+                pass
+        process_start = _process_start_uptime()
+        if process_start is not None:
+            self.marks[MARK_PROCESS_START] = round(process_start, 3)
+
+    @property
+    def ready(self):
+        return MARK_READY in self.marks
+
+    def has_mark(self, name):
+        return name in self.marks
+
+    def mark(self, name):
+        """记录阶段时刻，同一阶段只记录第一次"""
+        with self._lock:
+            if name in self.marks:
+                return
+            self.marks[name] = round(boot_uptime(), 3)
+        logger.info("启动阶段 %s: %.3fs", name, self.marks[name])
+        if name in (MARK_FIRST_RESPONSE, MARK_READY):
+            self.save()
+
+    def require(self, *names):
+        """登记就绪检查项，全部通过后记录 ready"""
+        with self._lock:
+            for name in names:
+                self.checks.setdefault(name, False)
+
+    def set_check(self, name, ok=True):
+        with self._lock:
+            self.checks[name] = ok
+            all_ok = all(self.checks.values())
+        if all_ok:
+            self.mark(MARK_READY)
+
+    def watch_network(self):
+        """后台等待网络就绪，不阻塞面板启动"""
+        self.require('network')
+
+        def wait_network():
+            deadline = time.monotonic() + NETWORK_WAIT_TIMEOUT
+            while not network_is_up():
+                if time.monotonic() > deadline:
+                    logger.warning("等待网络超时 (%ss)", NETWORK_WAIT_TIMEOUT)
+                    return
+                time.sleep(NETWORK_POLL_INTERVAL)
+            self.set_check('network')
+
+        threading.Thread(target=wait_network, daemon=True).start()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'boot_id': self.boot_id,
+                'ready': MARK_READY in self.marks,
+                'checks': dict(self.checks),
+                'marks': dict(sorted(self.marks.items(), key=lambda item: item[1]))
+            }
+
+    def load_history(self):
+        try:
+            with open(self.trace_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def save(self):
+        """按 boot_id 合并写入历史记录（原子替换）"""
+        entry = self.snapshot()
+        entry.pop('checks')
+        entry['recorded_at'] = time.time()
+        history = [h for h in self.load_history() if h.get('boot_id') != self.boot_id]
+        history.append(entry)
+        tmp_path = self.trace_file.with_name(self.trace_file.name + '.tmp')
+        try:
+            self.trace_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(history[-MAX_BOOT_RECORDS:], f, indent=2)
+            os.replace(tmp_path, self.trace_file)
+        except OSError as e:
+            logger.warning("无法保存启动时间记录: %s", e)
+
+
+# 全局实例
+boot_trace = BootTrace(os.environ.get('BOOT_TRACE_FILE', BOOT_TRACE_FILE))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Capture Compactor - 捕获完成后流式精简 pcap，只保留目标的信标与 EAPOL 帧"""
+
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+from pcap_reader import (
+    PcapReader,
+    PcapWriter,
+    PcapError,
+    decode_80211,
+    FRAME_TYPE_MGMT,
+    SUBTYPE_ASSOC_REQ,
+    SUBTYPE_REASSOC_REQ,
+    SUBTYPE_PROBE_RESP,
+    SUBTYPE_BEACON,
+)
+
+logger = logging.getLogger(__name__)
+
+ORIGINALS_DIR = '.originals'           # 原始文件保留目录（位于捕获目录下）
+ORIGINAL_GRACE_PERIOD = 24 * 3600      # 原始文件保留时长（秒）
+MAX_BEACON_FRAMES = 3                  # 每种信标类帧最多保留的数量，足够工具识别 ESSID
+
+
+def _keep_frame(frame, bssid, beacon_counts):
+    """判断帧是否需要保留"""
+    if frame is None:
+        return False
+
+    if frame.is_eapol:
+        return bssid in (frame.addr1, frame.addr2, frame.bssid)
+
+    if frame.type == FRAME_TYPE_MGMT and frame.bssid == bssid:
+        if frame.subtype in (SUBTYPE_BEACON, SUBTYPE_PROBE_RESP):
+            if beacon_counts.get(frame.subtype, 0) >= MAX_BEACON_FRAMES:
+                return False
+            beacon_counts[frame.subtype] = beacon_counts.get(frame.subtype, 0) + 1
+            return True
+        # 关联请求携带 ESSID 与 RSN 信息，hcxpcapngtool 提取 PMKID 时需要
+        return frame.subtype in (SUBTYPE_ASSOC_REQ, SUBTYPE_REASSOC_REQ)
+
+    return False
+
+
+def compact_capture(cap_file, bssid, keep_original=True):
+    """精简捕获文件，原子替换原文件
+
+    返回压缩统计信息字典；文件无法解析时返回 None。
+    """
+    cap_path = Path(cap_file)
+    bssid = bssid.upper()
+    tmp_path = cap_path.with_name(cap_path.name + '.compact.tmp')
+
+    try:
+        original_size = cap_path.stat().st_size
+        frames_total = 0
+        beacon_counts = {}
+
+        with open(cap_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            reader = PcapReader(src)
+            writer = PcapWriter(dst, reader.global_header)
+            for record in reader:
+                frames_total += 1
+                if _keep_frame(decode_80211(record.data, reader.linktype), bssid, beacon_counts):
+                    writer.write(record)
+            dst.flush()
+            os.fsync(dst.fileno())
+
+        original_file = None
+        if keep_original:
+            originals_dir = cap_path.parent / ORIGINALS_DIR
+            originals_dir.mkdir(exist_ok=True)
+            original_path = originals_dir / cap_path.name
+            if original_path.exists():
+                original_path.unlink()
+            try:
+                os.link(cap_path, original_path)
+            except OSError:
+                shutil.copy2(cap_path, original_path)
+            original_file = str(original_path)
+
+        os.replace(tmp_path, cap_path)
+
+        compacted_size = cap_path.stat().st_size
+        return {
+            'original_size': original_size,
+            'compacted_size': compacted_size,
+            'saved_bytes': original_size - compacted_size,
+            'frames_total': frames_total,
+            'frames_kept': writer.count,
+            'original_file': original_file,
+            'compacted_at': datetime.now().isoformat()
+        }
+    except (OSError, PcapError) as e:
+        logger.warning("精简捕获文件失败 %s: %s", cap_path.name, e)
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return None
+
+
+def purge_expired_originals(capture_dir, grace_period=ORIGINAL_GRACE_PERIOD):
+    """删除超过保留期的原始文件，返回删除数量"""
+    originals_dir = Path(capture_dir) / ORIGINALS_DIR
+    if not originals_dir.exists():
+        return 0
+
+    deleted = 0
+    now = time.time()
+    for f in originals_dir.iterdir():
+        try:
+            if now - f.stat().st_ctime > grace_period:
+                f.unlink()
+                deleted += 1
+        except OSError:
+            pass
+    return deleted
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Capture Index - 记录捕获文件的派生信息（压缩、校验等），持久化到 JSON"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SAVE_DELAY = 2  # 合并短时间内的多次修改，延迟写盘（秒）
+
+
+class CaptureIndex:
+    def __init__(self, index_file):
+        self.index_file = Path(index_file)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._timer = None
+        self.entries = self._load()
+
+    def _load(self):
+        """从文件加载索引"""
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error("Error loading capture index: %s", e)
+        return {}
+
+    def _save(self):
+        """标记有未写盘的修改，SAVE_DELAY 秒后统一写入（调用方持有 _lock）"""
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(SAVE_DELAY, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """把未写盘的修改原子写入索引文件"""
+        with self._save_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                data = json.dumps(self.entries, ensure_ascii=False, separators=(',', ':'))
+                self._dirty = False
+            try:
+                tmp_file = self.index_file.with_suffix('.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_file, self.index_file)
+            except Exception as e:
+                logger.error("Error saving capture index: %s", e)
+                with self._lock:
+                    self._dirty = True  # 下次修改或 flush 时重试
+
+    def get(self, filename):
+        """获取文件的索引记录"""
+        with self._lock:
+            return dict(self.entries.get(filename, {}))
+
+    def update(self, filename, /, **fields):
+        """合并更新文件的索引记录"""
+        with self._lock:
+            entry = self.entries.setdefault(filename, {})
+            entry.update(fields)
+            self._save()
+            return dict(entry)
+
+    def items(self):
+        """所有记录的快照"""
+        with self._lock:
+            return [(name, dict(entry)) for name, entry in self.entries.items()]
+
+    def __contains__(self, filename):
+        with self._lock:
+            return filename in self.entries
+
+    def remove(self, filename):
+        """删除文件的索引记录"""
+        with self._lock:
+            if self.entries.pop(filename, None) is not None:
+                self._save()
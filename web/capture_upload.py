@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""Capture Upload - 分块、可续传地导入外部 pcap/pcapng 文件，边写入边校验格式"""
+
+import json
+import logging
+import os
+import queue
+import re
+import struct
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from pcap_reader import PCAP_MAGICS, PCAP_GLOBAL_HEADER_LEN, PCAP_RECORD_HEADER_LEN, MAX_RECORD_LEN
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_DIR = '.uploads'                # 未完成的上传（位于捕获目录下，完成后可原子移动）
+UPLOAD_PREFIX = 'upload_'               # 导入文件的命名前缀
+UPLOAD_BLOCK_SIZE = 1024 * 1024         # 从请求流读取 / 校验的块大小
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024     # 建议客户端每次 PATCH 的分块大小
+UPLOAD_EXPIRE = 24 * 3600               # 未完成上传的保留时长（秒）
+MAX_UPLOAD_SIZE = 8 * 1024 ** 3
+
+# pcapng: Section Header Block 类型与字节序魔数
+PCAPNG_SHB_TYPE = 0x0A0D0D0A
+PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+PCAPNG_MIN_BLOCK_LEN = 12
+PCAPNG_MAX_BLOCK_LEN = 16 * 1024 * 1024
+PCAPNG_PACKET_BLOCKS = (0x00000003, 0x00000006)  # Simple / Enhanced Packet Block
+
+FORMAT_PCAP = 'pcap'
+FORMAT_PCAPNG = 'pcapng'
+FORMAT_EXTENSIONS = {FORMAT_PCAP: 'cap', FORMAT_PCAPNG: 'pcapng'}
+
+_SESSION_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadError(Exception):
+    """上传请求无效，status 为对应的 HTTP 状态码"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class StreamValidator:
+    """按记录边界增量校验已写入的数据，只读取记录头，状态可序列化以便续传"""
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.format = state.get('format')
+        self.endian = state.get('endian', '<')
+        self.boundary = state.get('boundary', 0)   # 下一条记录（块）的起始偏移
+        self.records = state.get('records', 0)
+
+    def state(self):
+        return {
+            'format': self.format,
+            'endian': self.endian,
+            'boundary': self.boundary,
+            'records': self.records
+        }
+
+    def advance(self, f, end):
+        """校验 [boundary, end) 中完整可见的记录头，格式错误时抛出 UploadError"""
+        if self.format is None:
+            if end < 12:
+                return
+            f.seek(0)
+            self._read_file_header(f.read(PCAP_GLOBAL_HEADER_LEN))
+            if self.format is None:
+                return
+        if self.format == FORMAT_PCAP:
+            self._advance_pcap(f, end)
+        else:
+            self._advance_pcapng(f, end)
+
+    def _read_file_header(self, header):
+        if header[:4] in PCAP_MAGICS:
+            if len(header) < PCAP_GLOBAL_HEADER_LEN:
+                return
+            self.format = FORMAT_PCAP
+            self.endian = PCAP_MAGICS[header[:4]][0]
+            self.boundary = PCAP_GLOBAL_HEADER_LEN
+        elif struct.unpack_from('<I', header)[0] == PCAPNG_SHB_TYPE:
+            self.format = FORMAT_PCAPNG
+            self.boundary = 0
+        else:
+            raise UploadError('不是有效的 pcap / pcapng 文件', 422)
+
+    def _advance_pcap(self, f, end):
+        record = struct.Struct(self.endian + 'IIII')
+        while self.boundary + PCAP_RECORD_HEADER_LEN <= end:
+            f.seek(self.boundary)
+            _, _, incl_len, _ = record.unpack(f.read(PCAP_RECORD_HEADER_LEN))
+            if incl_len > MAX_RECORD_LEN:
+                raise UploadError(f'偏移 {self.boundary} 处的记录长度无效', 422)
+            self.boundary += PCAP_RECORD_HEADER_LEN + incl_len
+            self.records += 1
+
+    def _advance_pcapng(self, f, end):
+        while self.boundary + PCAPNG_MIN_BLOCK_LEN <= end:
+            f.seek(self.boundary)
+            header = f.read(PCAPNG_MIN_BLOCK_LEN)
+            if struct.unpack_from('<I', header)[0] == PCAPNG_SHB_TYPE:
+                # 每个 section 可以有自己的字节序
+                magic = header[8:12]
+                if magic == struct.pack('<I', PCAPNG_BYTE_ORDER_MAGIC):
+                    self.endian = '<'
+                elif magic == struct.pack('>I', PCAPNG_BYTE_ORDER_MAGIC):
+                    self.endian = '>'
+                else:
+                    raise UploadError(f'偏移 {self.boundary} 处的 Section Header 字节序无效', 422)
+            block_type, block_len = struct.unpack_from(self.endian + 'II', header)
+            if block_len < PCAPNG_MIN_BLOCK_LEN or block_len % 4 or block_len > PCAPNG_MAX_BLOCK_LEN:
+                raise UploadError(f'偏移 {self.boundary} 处的块长度无效', 422)
+            if self.boundary + block_len > end:
+                return  # 块尾部尚未到达，等下一个分块再核对
+            f.seek(self.boundary + block_len - 4)
+            if struct.unpack(self.endian + 'I', f.read(4))[0] != block_len:
+                raise UploadError(f'偏移 {self.boundary} 处的块首尾长度不一致', 422)
+            self.boundary += block_len
+            if block_type in PCAPNG_PACKET_BLOCKS:
+                self.records += 1
+
+
+def _safe_name(filename):
+    stem = Path(filename).name.rsplit('.', 1)[0]
+    return "".join(c for c in stem if c.isalnum() or c in "._-")[:64] or 'capture'
+
+
+class UploadManager:
+    def __init__(self, capture_dir, on_complete=None):
+        self.capture_dir = Path(capture_dir)
+        self.upload_dir = self.capture_dir / UPLOADS_DIR
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.on_complete = on_complete  # 上传完成后在后台线程中调用，参数为捕获文件名
+        self._lock = threading.Lock()
+        self._session_locks = {}
+        self._ingest_queue = queue.Queue()
+        self._ingest_thread = None
+
+    def _meta_path(self, upload_id):
+        return self.upload_dir / f"{upload_id}.json"
+
+    def _part_path(self, upload_id):
+        return self.upload_dir / f"{upload_id}.part"
+
+    def _load(self, upload_id):
+        if not _SESSION_ID.match(upload_id or ''):
+            raise UploadError('上传不存在', 404)
+        try:
+            with open(self._meta_path(upload_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise UploadError('上传不存在', 404)
+
+    def _save(self, session):
+        meta_path = self._meta_path(session['id'])
+        tmp_path = meta_path.with_name(meta_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(session, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    def _discard(self, upload_id):
+        with self._lock:
+            self._session_locks.pop(upload_id, None)
+        for path in (self._part_path(upload_id), self._meta_path(upload_id)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _session_lock(self, upload_id):
+        with self._lock:
+            return self._session_locks.setdefault(upload_id, threading.Lock())
+
+    def _status(self, session):
+        try:
+            offset = self._part_path(session['id']).stat().st_size
+        except OSError:
+            offset = 0
+        return {
+            'id': session['id'],
+            'filename': session['filename'],
+            'size': session['size'],
+            'offset': offset,
+            'format': session['validator'].get('format'),
+            'created': session['created'],
+            'updated': session['updated'],
+            'chunk_size': UPLOAD_CHUNK_SIZE
+        }
+
+    def create(self, filename, size):
+        """登记一次上传，返回续传所需的状态"""
+        if not filename:
+            raise UploadError('缺少文件名')
+        if not isinstance(size, int) or size <= 0:
+            raise UploadError('文件大小无效')
+        if size > MAX_UPLOAD_SIZE:
+            raise UploadError(f'文件超过 {MAX_UPLOAD_SIZE} 字节上限', 413)
+        self.purge_expired()
+
+        now = time.time()
+        session = {
+            'id': uuid.uuid4().hex,
+            'filename': Path(filename).name,
+            'size': size,
+            'created': now,
+            'updated': now,
+            'validator': StreamValidator().state()
+        }
+        self._part_path(session['id']).touch()
+        self._save(session)
+        logger.info("开始导入捕获文件: %s (%s 字节)", session['filename'], size)
+        return self._status(session)
+
+    def status(self, upload_id):
+        return self._status(self._load(upload_id))
+
+    def list_uploads(self):
+        uploads = []
+        for meta_path in self.upload_dir.glob('*.json'):
+            try:
+                uploads.append(self.status(meta_path.stem))
+            except UploadError:
+                continue
+        uploads.sort(key=lambda x: x['created'])
+        return uploads
+
+    def cancel(self, upload_id):
+        self._load(upload_id)
+        with self._session_lock(upload_id):
+            self._discard(upload_id)
+
+    def write_chunk(self, upload_id, offset, stream):
+        """把请求体流式追加到 offset 处，边写边校验；完成时返回的状态带 capture 字段"""
+        session = self._load(upload_id)
+        lock = self._session_lock(upload_id)
+        if not lock.acquire(blocking=False):
+            raise UploadError('该上传正在写入', 409)
+        try:
+            part_path = self._part_path(upload_id)
+            current = part_path.stat().st_size
+            if offset != current:
+                raise UploadError('分块偏移与已接收的数据不一致', 409, offset=current)
+
+            validator = StreamValidator(session['validator'])
+            remaining = session['size'] - current
+            try:
+                with open(part_path, 'r+b') as f:
+                    end = current
+                    while True:
+                        block = stream.read(min(UPLOAD_BLOCK_SIZE, remaining + 1))
+                        if not block:
+                            break
+                        if len(block) > remaining:
+                            raise UploadError('数据超出登记的文件大小', 413, offset=end)
+                        f.seek(end)
+                        f.write(block)
+                        end += len(block)
+                        remaining -= len(block)
+                        f.flush()
+                        validator.advance(f, end)
+            except UploadError as e:
+                if e.status == 422:
+                    logger.warning("导入的捕获文件格式错误 %s: %s", session['filename'], e)
+                    self._discard(upload_id)
+                raise
+            finally:
+                session['validator'] = validator.state()
+                session['updated'] = time.time()
+                if self._meta_path(upload_id).exists():
+                    self._save(session)
+
+            status = self._status(session)
+            if status['offset'] == session['size']:
+                status['capture'] = self._complete(session, validator)
+            return status
+        finally:
+            lock.release()
+
+    def _complete(self, session, validator):
+        """上传完成：移入捕获目录并交给后台线程索引与转换"""
+        upload_id = session['id']
+        if validator.format is None or validator.records == 0:
+            self._discard(upload_id)
+            raise UploadError('文件不包含任何数据包', 422)
+
+        extension = FORMAT_EXTENSIONS[validator.format]
+        name = f"{UPLOAD_PREFIX}{_safe_name(session['filename'])}"
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"{name}_{timestamp}.{extension}"
+        suffix = 1
+        # 序号放在时间戳之前，删除时按 "<名称>*" 匹配相关文件不会误删同名的其他导入
+        while (self.capture_dir / filename).exists():
+            suffix += 1
+            filename = f"{name}_{suffix}_{timestamp}.{extension}"
+        target = self.capture_dir / filename
+        os.replace(self._part_path(upload_id), target)
+        self._discard(upload_id)
+        logger.info("捕获文件导入完成: %s (%s 条记录)", filename, validator.records,
+                    extra={'capture': filename})
+
+        self._enqueue_ingest(filename)
+        return {
+            'filename': filename,
+            'format': validator.format,
+            'records': validator.records,
+            'truncated': validator.boundary != session['size']
+        }
+
+    def _enqueue_ingest(self, filename):
+        if self.on_complete is None:
+            return
+        self._ingest_queue.put(filename)
+        with self._lock:
+            if self._ingest_thread is None or not self._ingest_thread.is_alive():
+                self._ingest_thread = threading.Thread(target=self._ingest_loop, daemon=True)
+                self._ingest_thread.start()
+
+    def _ingest_loop(self):
+        """逐个处理导入的文件，大文件的索引与转换不占用 Web 请求线程"""
+        while True:
+            try:
+                filename = self._ingest_queue.get(timeout=60)
+            except queue.Empty:
+                with self._lock:
+                    if self._ingest_queue.empty():
+                        self._ingest_thread = None
+                        return
+                continue
+            try:
+                self.on_complete(filename)
+            except Exception as e:
+                logger.exception("导入文件后台处理失败 %s: %s", filename, e)
+
+    def purge_expired(self, expire=UPLOAD_EXPIRE):
+        """删除超过保留时长仍未完成的上传，返回删除数量"""
+        deleted = 0
+        now = time.time()
+        for meta_path in self.upload_dir.glob('*.json'):
+            try:
+                if now - meta_path.stat().st_mtime > expire:
+                    self._discard(meta_path.stem)
+                    deleted += 1
+            except OSError:
+                pass
+        return deleted
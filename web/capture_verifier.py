@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Capture Verifier - 捕获结束后流式校验 pcap 记录边界，截掉被中断写入的尾部记录"""
+
+import logging
+import os
+import shutil
+import struct
+from datetime import datetime
+from pathlib import Path
+
+from pcap_reader import PCAP_MAGICS, PCAP_GLOBAL_HEADER_LEN, PCAP_RECORD_HEADER_LEN, MAX_RECORD_LEN
+
+logger = logging.getLogger(__name__)
+
+# 校验结果
+INTEGRITY_CLEAN = 'clean'          # 所有记录完整
+INTEGRITY_REPAIRED = 'repaired'    # 尾部不完整的记录已截掉
+INTEGRITY_CORRUPT = 'corrupt'      # 中途出现无效记录，之后的数据过多，不自动截断
+INTEGRITY_INVALID = 'invalid'      # 全局头不完整或不是 pcap
+
+# 无效边界之后的数据不超过一条最大记录时，才视为被中断的尾部记录
+MAX_TAIL_LEN = PCAP_RECORD_HEADER_LEN + MAX_RECORD_LEN
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _scan_records(f, size):
+    """只读取记录头逐条跳过，返回 (最后一条完整记录之后的偏移, 记录数)"""
+    header = f.read(PCAP_GLOBAL_HEADER_LEN)
+    endian = PCAP_MAGICS[header[:4]][0]
+    record = struct.Struct(endian + 'IIII')
+
+    valid_end = PCAP_GLOBAL_HEADER_LEN
+    records = 0
+    while valid_end + PCAP_RECORD_HEADER_LEN <= size:
+        f.seek(valid_end)
+        _, _, incl_len, _ = record.unpack(f.read(PCAP_RECORD_HEADER_LEN))
+        end = valid_end + PCAP_RECORD_HEADER_LEN + incl_len
+        if incl_len > MAX_RECORD_LEN or end > size:
+            break
+        valid_end = end
+        records += 1
+    return valid_end, records
+
+
+def _trim(cap_path, valid_end):
+    """截掉 valid_end 之后的数据；文件有其他硬链接时写入截断副本再原子替换，不改动共享的 inode"""
+    if cap_path.stat().st_nlink <= 1:
+        with open(cap_path, 'r+b') as f:
+            f.truncate(valid_end)
+            os.fsync(f.fileno())
+        return
+
+    tmp_path = cap_path.with_name(cap_path.name + '.trim.tmp')
+    try:
+        with open(cap_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            remaining = valid_end
+            while remaining:
+                chunk = src.read(min(remaining, COPY_CHUNK_SIZE))
+                if not chunk:
+                    break
+                dst.write(chunk)
+                remaining -= len(chunk)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copymode(cap_path, tmp_path)
+        os.replace(tmp_path, cap_path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def verify_capture(cap_file):
+    """校验捕获文件，把被中断的尾部记录截掉
+
+    返回写入捕获索引的 integrity 字典；不是 pcap（如 pcapng）时返回 None。
+    """
+    cap_path = Path(cap_file)
+    size = cap_path.stat().st_size
+    # 只读打开：文件无需修复时不产生写关闭事件，监听线程不会重新索引
+    with open(cap_path, 'rb') as f:
+        magic = f.read(4)
+        f.seek(0)
+        if magic not in PCAP_MAGICS:
+            return None if size >= 4 else _result(cap_path, INTEGRITY_INVALID, 0, 0)
+        if size < PCAP_GLOBAL_HEADER_LEN:
+            return _result(cap_path, INTEGRITY_INVALID, 0, 0)
+        valid_end, records = _scan_records(f, size)
+
+    tail = size - valid_end
+    if not tail:
+        state = INTEGRITY_CLEAN
+    elif tail > MAX_TAIL_LEN:
+        state = INTEGRITY_CORRUPT
+        logger.warning("捕获文件在偏移 %s 处损坏，之后还有 %s 字节，未自动修复",
+                       valid_end, tail, extra={'capture': cap_path.name})
+    else:
+        _trim(cap_path, valid_end)
+        state = INTEGRITY_REPAIRED
+        logger.info("已截掉不完整的尾部记录: %s (%s 字节)", cap_path.name, tail,
+                    extra={'capture': cap_path.name})
+
+    return _result(cap_path, state, records, tail if state == INTEGRITY_REPAIRED else 0)
+
+
+def _result(cap_path, state, records, trimmed_bytes):
+    stat = cap_path.stat()
+    return {
+        'state': state,
+        'records': records,
+        'trimmed_bytes': trimmed_bytes,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'verified_at': datetime.now().isoformat()
+    }
+
+
+def is_current(integrity, stat):
+    """校验结果是否仍对应文件当前的内容"""
+    return bool(integrity) and integrity.get('size') == stat.st_size \
+        and integrity.get('mtime_ns') == stat.st_mtime_ns
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Capture Watcher - 基于 inotify 监听捕获目录，增量维护捕获索引并推送变化"""
+
+import ctypes
+import fnmatch
+import logging
+import os
+import struct
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from content_store import file_sha256
+from event_bus import (
+    event_bus,
+    EVENT_CAPTURE_ADDED,
+    EVENT_CAPTURE_REMOVED,
+    EVENT_CAPTURE_CONVERTED,
+)
+
+logger = logging.getLogger(__name__)
+
+# airodump-ng 的捕获文件，以及通过上传导入的外部文件
+CAPTURE_PATTERNS = ('handshake_*-01.cap', 'upload_*.cap', 'upload_*.pcapng')
+CAPTURE_EXTENSIONS = ('cap', 'pcapng')
+CONVERTED_FORMATS = ('hc22000', 'pmkid')
+SUPPORTED_FORMATS = ['cap', 'hc22000', 'pmkid']  # 支持转换的格式
+SETTLE_TIME = 2          # 全量同步时跳过最近仍在写入的文件（秒）
+POLL_INTERVAL = 5        # inotify 不可用时的轮询间隔（秒）
+
+# inotify 事件掩码
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def check_handshake(cap_file):
+    """用 aircrack-ng 检查文件是否包含握手包"""
+    try:
+        result = subprocess.run(
+            ["aircrack-ng", str(cap_file)],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        return "1 handshake" in result.stdout
+    except Exception:
+        return False
+
+
+class CaptureWatcher:
+    def __init__(self, capture_dir, capture_index):
+        self.capture_dir = Path(capture_dir)
+        self.capture_index = capture_index
+        self.is_running = False
+        self._lock = threading.Lock()
+        self._thread = None
+        self._inotify_fd = None
+
+    # ==================== 索引维护 ====================
+
+    def is_capture_file(self, name):
+        """是否为捕获库中的文件"""
+        return any(fnmatch.fnmatch(name, pattern) for pattern in CAPTURE_PATTERNS)
+
+    def _available_formats(self, cap_path):
+        base_name = str(cap_path).rsplit('.', 1)[0]
+        formats = ['cap']  # 原始格式总是可用
+        for fmt in CONVERTED_FORMATS:
+            if os.path.exists(f"{base_name}.{fmt}"):
+                formats.append(fmt)
+        return formats
+
+    def _index_file(self, cap_path, stat=None):
+        """计算单个文件的索引记录，文件内容变化时才重新检查握手包"""
+        stat = stat or cap_path.stat()
+        entry = self.capture_index.get(cap_path.name)
+        fields = {
+            'filename': cap_path.name,
+            'path': str(cap_path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
+            'available_formats': self._available_formats(cap_path),
+            'supported_formats': SUPPORTED_FORMATS
+        }
+        if entry.get('size') != stat.st_size or entry.get('mtime') != stat.st_mtime:
+            fields['sha256'] = file_sha256(cap_path)
+            fields['has_handshake'] = check_handshake(cap_path)
+        return self.capture_index.update(cap_path.name, **fields)
+
+    def refresh(self, filename):
+        """重新索引单个文件并推送 capture_added"""
+        cap_path = self.capture_dir / filename
+        with self._lock:
+            try:
+                entry = self._index_file(cap_path)
+            except OSError:
+                return None
+        event_bus.publish(EVENT_CAPTURE_ADDED, {'capture': entry})
+        return entry
+
+    def owner_of(self, name):
+        """转换结果所属的捕获文件名，按基础名在各捕获格式中查找"""
+        base_name, _, fmt = name.rpartition('.')
+        if fmt not in CONVERTED_FORMATS:
+            return None
+        for ext in CAPTURE_EXTENSIONS:
+            cap_name = f"{base_name}.{ext}"
+            if self.is_capture_file(cap_name) and cap_name in self.capture_index:
+                return cap_name
+        return None
+
+    def update_formats(self, filename):
+        """重新检查文件已有的转换结果，新增格式时推送 capture_converted"""
+        with self._lock:
+            previous = self.capture_index.get(filename).get('available_formats') or []
+            formats = self._available_formats(self.capture_dir / filename)
+            if formats == previous:
+                return None
+            entry = self.capture_index.update(filename, available_formats=formats)
+        added = [fmt for fmt in formats if fmt not in previous]
+        if added:
+            event_bus.publish(EVENT_CAPTURE_CONVERTED, {'capture': entry, 'format': added[0]})
+        return entry
+
+    def forget(self, filename):
+        """从索引中移除并推送 capture_removed"""
+        with self._lock:
+            self.capture_index.remove(filename)
+        event_bus.publish(EVENT_CAPTURE_REMOVED, {'filename': filename})
+
+    def sync(self):
+        """全量同步目录与索引，只处理有变化的文件"""
+        now = time.time()
+        seen = set()
+        with self._lock:
+            for cap_path in self.capture_dir.iterdir():
+                if not self.is_capture_file(cap_path.name):
+                    continue
+                seen.add(cap_path.name)
+                try:
+                    stat = cap_path.stat()
+                except OSError:
+                    continue
+                entry = self.capture_index.get(cap_path.name)
+                formats = self._available_formats(cap_path)
+                if (entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime
+                        and entry.get('available_formats') == formats):
+                    continue
+                if now - stat.st_mtime < SETTLE_TIME:
+                    continue  # 仍在写入，等关闭后再索引
+                entry = self._index_file(cap_path, stat)
+                event_bus.publish(EVENT_CAPTURE_ADDED, {'capture': entry})
+
+            stale = [
+                name for name, entry in self.capture_index.items()
+                if 'path' in entry and name not in seen
+            ]
+            for name in stale:
+                self.capture_index.remove(name)
+                event_bus.publish(EVENT_CAPTURE_REMOVED, {'filename': name})
+
+    def list_captures(self):
+        """返回捕获列表（按创建时间倒序）"""
+        if not self.is_running:
+            self.sync()
+        captures = [entry for _, entry in self.capture_index.items() if 'path' in entry]
+        captures.sort(key=lambda x: x['created'], reverse=True)
+        return captures
+
+    # ==================== 目录监听 ====================
+
+    def start(self):
+        """启动监听线程；inotify 不可用时退化为定期同步"""
+        if self.is_running:
+            return
+        self.sync()
+        self.is_running = True
+        self._inotify_fd = self._init_inotify()
+        target = self._inotify_loop if self._inotify_fd is not None else self._poll_loop
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+    def _init_inotify(self):
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+            wd = libc.inotify_add_watch(fd, str(self.capture_dir).encode(), WATCH_MASK)
+            if wd < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), 'inotify_add_watch failed')
+            return fd
+        except (OSError, AttributeError) as e:
+            logger.warning("inotify 不可用，改为每 %s 秒同步捕获目录: %s", POLL_INTERVAL, e)
+            return None
+
+    def _poll_loop(self):
+        while self.is_running:
+            time.sleep(POLL_INTERVAL)
+            try:
+                self.sync()
+            except Exception as e:
+                logger.exception("Capture sync error: %s", e)
+
+    def _inotify_loop(self):
+        while self.is_running:
+            try:
+                buf = os.read(self._inotify_fd, 64 * 1024)
+            except OSError as e:
+                logger.error("inotify read error: %s", e)
+                break
+
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                _, mask, _, name_len = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                name = buf[offset:offset + name_len].rstrip(b'\0').decode('utf-8', errors='replace')
+                offset += name_len
+                try:
+                    self._handle_event(mask, name)
+                except Exception as e:
+                    logger.exception("Capture watcher error (%s): %s", name, e)
+
+            if not self.is_running:
+                break
+
+        # 监听失败时退化为轮询
+        if self.is_running:
+            self._poll_loop()
+
+    def _handle_event(self, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            self.sync()
+            return
+        if mask & IN_DELETE_SELF:
+            self.is_running = False
+            return
+
+        removed = mask & (IN_DELETE | IN_MOVED_FROM)
+        if self.is_capture_file(name):
+            if removed:
+                self.forget(name)
+            else:
+                self.refresh(name)
+            return
+
+        cap_name = self.owner_of(name)
+        if cap_name:
+            self.update_formats(cap_name)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Content Store - 按 SHA-256 内容去重捕获文件，重复文件硬链接并共享转换结果"""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+SHARED_FORMATS = ('hc22000', 'pmkid')  # 可在重复文件间共享的转换结果
+
+
+def file_sha256(path):
+    """流式计算文件的 SHA-256，内存占用与文件大小无关"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _replace_with_link(source, target):
+    """把 target 原子替换为 source 的硬链接"""
+    tmp_path = target.with_name(target.name + '.link.tmp')
+    try:
+        tmp_path.unlink()
+    except FileNotFoundError:
+        pass
+    os.link(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+class ContentStore:
+    def __init__(self, capture_dir, capture_index):
+        self.capture_dir = Path(capture_dir)
+        self.capture_index = capture_index
+
+    def _converted_path(self, cap_name, fmt):
+        return self.capture_dir / f"{cap_name.rsplit('.', 1)[0]}.{fmt}"
+
+    def content_hash(self, filename):
+        """取索引中的 SHA-256；文件在索引后有变化则重新计算"""
+        cap_path = self.capture_dir / filename
+        stat = cap_path.stat()
+        entry = self.capture_index.get(filename)
+        if (entry.get('sha256') and entry.get('size') == stat.st_size
+                and entry.get('mtime') == stat.st_mtime):
+            return entry['sha256']
+        sha256 = file_sha256(cap_path)
+        self.capture_index.update(filename, sha256=sha256)
+        return sha256
+
+    def find_duplicates(self, filename, sha256):
+        """索引中内容相同的其他捕获文件"""
+        return [
+            name for name, entry in self.capture_index.items()
+            if name != filename and entry.get('sha256') == sha256
+            and (self.capture_dir / name).exists()
+        ]
+
+    def deduplicate(self, filename):
+        """与已有的相同内容文件合并为硬链接，并链接其转换结果；返回节省的字节数"""
+        cap_path = self.capture_dir / filename
+        try:
+            sha256 = self.content_hash(filename)
+        except OSError:
+            return 0
+
+        saved = 0
+        for name in self.find_duplicates(filename, sha256):
+            source = self.capture_dir / name
+            try:
+                if not os.path.samefile(source, cap_path):
+                    size = cap_path.stat().st_size
+                    _replace_with_link(source, cap_path)
+                    saved += size
+                    source_entry = self.capture_index.get(name)
+                    stat = cap_path.stat()
+                    # 同步 size/mtime，避免监听线程把链接替换当作内容变化重新检查
+                    self.capture_index.update(
+                        filename,
+                        size=stat.st_size,
+                        mtime=stat.st_mtime,
+                        has_handshake=source_entry.get('has_handshake', False),
+                        duplicate_of=name
+                    )
+                    logger.info("捕获文件内容重复，已硬链接: %s -> %s", filename, name,
+                                extra={'sha256': sha256})
+                for fmt in SHARED_FORMATS:
+                    saved += self._link_conversion(name, filename, fmt)
+            except OSError as e:
+                logger.warning("去重失败 %s: %s", filename, e)
+            break
+        return saved
+
+    def _link_conversion(self, source_name, target_name, fmt):
+        source = self._converted_path(source_name, fmt)
+        target = self._converted_path(target_name, fmt)
+        if not source.exists():
+            return 0
+        if target.exists():
+            if os.path.samefile(source, target) or file_sha256(source) != file_sha256(target):
+                return 0
+            size = target.stat().st_size
+            _replace_with_link(source, target)
+            return size
+        _replace_with_link(source, target)
+        return 0
+
+    def shared_conversion(self, filename, fmt):
+        """若内容相同的文件已有转换结果，链接过来并返回路径，免去重新转换"""
+        if fmt not in SHARED_FORMATS:
+            return None
+        try:
+            sha256 = self.content_hash(filename)
+        except OSError:
+            return None
+        for name in self.find_duplicates(filename, sha256):
+            source = self._converted_path(name, fmt)
+            if source.exists():
+                target = self._converted_path(filename, fmt)
+                try:
+                    _replace_with_link(source, target)
+                except OSError as e:
+                    logger.warning("共享转换结果失败 %s: %s", filename, e)
+                    return None
+                return str(target)
+        return None
+
+    def deduplicate_all(self):
+        """对索引中的全部捕获文件去重，返回节省的字节数"""
+        saved = 0
+        for name, entry in self.capture_index.items():
+            if 'path' in entry:
+                saved += self.deduplicate(name)
+        if saved:
+            logger.info("捕获库去重完成，节省 %s 字节", saved)
+        return saved
+
+    def stats(self):
+        """逻辑字节（各文件大小之和）与物理字节（按 inode 去重）"""
+        logical = 0
+        physical = 0
+        files = 0
+        inodes = set()
+        for name, entry in self.capture_index.items():
+            if 'path' not in entry:
+                continue
+            paths = [self.capture_dir / name] + [self._converted_path(name, fmt) for fmt in SHARED_FORMATS]
+            for path in paths:
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files += 1
+                logical += stat.st_size
+                key = (stat.st_dev, stat.st_ino)
+                if key not in inodes:
+                    inodes.add(key)
+                    physical += stat.st_size
+        return {
+            'files': files,
+            'unique_files': len(inodes),
+            'logical_bytes': logical,
+            'physical_bytes': physical,
+            'saved_bytes': logical - physical
+        }
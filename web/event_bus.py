@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Event Bus - 进程内发布/订阅事件总线，状态变化即时推送"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# 事件类型定义
+EVENT_STATUS_CHANGED = 'status_changed'          # 扫描/捕获/攻击状态变化
+EVENT_NETWORKS_UPDATED = 'networks_updated'      # 扫描结果入库
+EVENT_HIDDEN_SSID_FOUND = 'hidden_ssid_found'    # 揭示了隐藏 SSID
+EVENT_HANDSHAKE_CAPTURED = 'handshake_captured'  # 捕获到握手包
+EVENT_CAPTURE_ADDED = 'capture_added'            # 捕获库新增/更新文件
+EVENT_CAPTURE_REMOVED = 'capture_removed'        # 捕获库删除文件
+EVENT_CAPTURE_CONVERTED = 'capture_converted'    # 捕获文件转换完成
+EVENT_CAPTURE_COMPACTED = 'capture_compacted'    # 捕获文件精简完成
+EVENT_HISTORY_UPDATED = 'history_updated'        # 攻击历史变化
+EVENT_AUTO_CAPTURE_UPDATED = 'auto_capture_updated'  # 批量捕获进度变化
+
+# 捕获库增量变化，按命名事件推送给前端
+LIBRARY_EVENTS = (
+    EVENT_CAPTURE_ADDED,
+    EVENT_CAPTURE_REMOVED,
+    EVENT_CAPTURE_CONVERTED,
+    EVENT_CAPTURE_COMPACTED,
+)
+
+# 合并窗口：唤醒后再等这么久，把同一批变化合并为一次推送
+COALESCE_WINDOW = 0.05
+
+
+class EventBus:
+    def __init__(self, history_size=256):
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._history = deque(maxlen=history_size)
+        self._subscribers = []  # (callback, types)
+        self.epoch = uuid.uuid4().hex[:12]  # 进程重启后序号从 0 开始，客户端据此判断序号是否仍有效
+
+    @property
+    def seq(self):
+        """当前最新事件序号"""
+        with self._cond:
+            return self._seq
+
+    def publish(self, event_type, data=None):
+        """发布事件，唤醒所有等待者并同步调用订阅回调"""
+        with self._cond:
+            self._seq += 1
+            event = {
+                'seq': self._seq,
+                'type': event_type,
+                'data': data,
+                'timestamp': time.time()
+            }
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+            self._cond.notify_all()
+
+        for callback, types in subscribers:
+            if types is not None and event_type not in types:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                logger.exception("Event subscriber error (%s): %s", event_type, e)
+        return event
+
+    def subscribe(self, callback, types=None):
+        """注册回调，types 为 None 表示接收全部事件"""
+        with self._cond:
+            self._subscribers.append((callback, set(types) if types else None))
+        return callback
+
+    def unsubscribe(self, callback):
+        """取消注册回调"""
+        with self._cond:
+            self._subscribers = [(cb, t) for cb, t in self._subscribers if cb is not callback]
+
+    def has_history(self, since_seq):
+        """since_seq 之后的事件是否都还在历史中，可以完整重放"""
+        with self._cond:
+            if since_seq > self._seq:
+                return False
+            return not self._history or self._history[0]['seq'] <= since_seq + 1
+
+    def _events_since(self, seq, types):
+        return [
+            e for e in self._history
+            if e['seq'] > seq and (types is None or e['type'] in types)
+        ]
+
+    def wait(self, since_seq, timeout=None, types=None, coalesce=COALESCE_WINDOW):
+        """阻塞等待 since_seq 之后的新事件
+
+        返回 (最新序号, 事件列表)；超时返回空列表。唤醒后等待 coalesce 秒
+        以合并短时间内连续发生的变化。
+        """
+        types = set(types) if types else None
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                events = self._events_since(since_seq, types)
+                if events:
+                    break
+                # 不关心的事件也推进序号，避免重复扫描
+                since_seq = self._seq
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return since_seq, []
+                self._cond.wait(remaining)
+
+        if coalesce:
+            time.sleep(coalesce)
+            with self._cond:
+                events = self._events_since(since_seq, types)
+
+        return events[-1]['seq'], events
+
+
+# 全局实例
+event_bus = EventBus()
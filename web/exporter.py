@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Exporter - 以 CSV / NDJSON / Parquet 流式导出记录，内存占用有上限"""
+
+import csv
+import io
+import json
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 可选，缺失时不提供 Parquet 导出
+    pa = None
+    pq = None
+
+CHUNK_ROWS = 1000  # 每个输出块（及 Parquet 行组）的行数
+
+# Parquet 列类型：显式声明，避免首个块全为空值的列被推断为 null 类型；未列出的字段按字符串处理
+PARQUET_TYPES = {
+    'timestamp': 'float64',
+    'last_seen': 'float64',
+    'bssid': 'string',
+    'essid': 'string',
+    'channel': 'int32',
+    'power': 'int32',
+    'encryption': 'string',
+    'cipher': 'string',
+    'auth': 'string',
+    'is_hidden': 'bool_',
+    'revealed': 'bool_',
+    'attack_status': 'string',
+    'vendor': 'string',
+}
+
+EXPORT_FORMATS = {
+    'csv': {'mimetype': 'text/csv', 'extension': 'csv'},
+    'ndjson': {'mimetype': 'application/x-ndjson', 'extension': 'ndjson'},
+    'parquet': {'mimetype': 'application/vnd.apache.parquet', 'extension': 'parquet'},
+}
+
+
+def is_format_available(format_type):
+    """导出格式是否可用"""
+    if format_type == 'parquet':
+        return pq is not None
+    return format_type in EXPORT_FORMATS
+
+
+def _chunks(rows, size=CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_csv(rows, fields):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+    for chunk in _chunks(rows):
+        writer.writerows(chunk)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def iter_ndjson(rows, fields):
+    for chunk in _chunks(rows):
+        yield ''.join(
+            json.dumps({k: row.get(k) for k in fields}, ensure_ascii=False) + '\n'
+            for row in chunk
+        )
+
+
+class _StreamSink(io.RawIOBase):
+    """ParquetWriter 的输出目标，写入的数据由生成器取走"""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buf.extend(data)
+        return len(data)
+
+    def take(self):
+        data = bytes(self._buf)
+        self._buf.clear()
+        return data
+
+
+def parquet_schema(fields):
+    """按 PARQUET_TYPES 构造导出字段的 Parquet schema"""
+    return pa.schema([
+        (field, getattr(pa, PARQUET_TYPES.get(field, 'string'))())
+        for field in fields
+    ])
+
+
+def iter_parquet(rows, fields):
+    sink = _StreamSink()
+    schema = parquet_schema(fields)
+    writer = pq.ParquetWriter(sink, schema)
+    for chunk in _chunks(rows):
+        table = pa.Table.from_pylist([{k: row.get(k) for k in fields} for row in chunk], schema=schema)
+        writer.write_table(table)
+        data = sink.take()
+        if data:
+            yield data
+    writer.close()
+    yield sink.take()
+
+
+def stream_export(rows, fields, format_type):
+    """按格式返回输出块生成器"""
+    if format_type == 'csv':
+        return iter_csv(rows, fields)
+    if format_type == 'ndjson':
+        return iter_ndjson(rows, fields)
+    if format_type == 'parquet':
+        return iter_parquet(rows, fields)
+    raise ValueError(f'不支持的导出格式: {format_type}')
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""Frame Index - 捕获文件的帧偏移索引，支持随机访问与按类型分页浏览"""
+
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from pcap_reader import (
+    PcapReader,
+    PcapError,
+    decode_80211,
+    radiotap_signal,
+    FRAME_TYPE_MGMT,
+    FRAME_TYPE_CTRL,
+    FRAME_TYPE_DATA,
+)
+
+logger = logging.getLogger(__name__)
+
+INDEX_MAGIC = b'WCFI'
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.fidx'
+# 头部: 魔数, 版本, 链路类型, pcap 大小, pcap mtime_ns, 帧数, 是否截断
+_INDEX_HEADER = struct.Struct('<4sHHQqQB7x')
+_OFFSET = struct.Struct('<Q')
+MAX_OPEN_INDEXES = 8
+REBUILD_INTERVAL = 5      # 文件仍在追加写入时，两次重建之间至少间隔的秒数
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# 每帧一个字节的类型码: bit0-3 子类型, bit4-5 类型, bit6 无法解析, bit7 EAPOL
+KIND_UNDECODABLE = 0x40
+KIND_EAPOL = 0x80
+
+FRAME_TYPE_NAMES = {FRAME_TYPE_MGMT: 'mgmt', FRAME_TYPE_CTRL: 'ctrl', FRAME_TYPE_DATA: 'data'}
+MGMT_SUBTYPE_NAMES = {
+    0: 'assoc_req', 1: 'assoc_resp', 2: 'reassoc_req', 3: 'reassoc_resp',
+    4: 'probe_req', 5: 'probe_resp', 8: 'beacon', 9: 'atim',
+    10: 'disassoc', 11: 'auth', 12: 'deauth', 13: 'action'
+}
+CTRL_SUBTYPE_NAMES = {8: 'block_ack_req', 9: 'block_ack', 10: 'ps_poll', 11: 'rts', 12: 'cts', 13: 'ack'}
+FRAME_FILTERS = ('mgmt', 'ctrl', 'data', 'eapol')
+
+
+def _frame_kind(frame):
+    if frame is None:
+        return KIND_UNDECODABLE
+    kind = (frame.type & 0x3) << 4 | frame.subtype
+    if frame.is_eapol:
+        kind |= KIND_EAPOL
+    return kind
+
+
+def subtype_name(frame_type, subtype):
+    if frame_type == FRAME_TYPE_MGMT:
+        return MGMT_SUBTYPE_NAMES.get(subtype, f'mgmt_{subtype}')
+    if frame_type == FRAME_TYPE_CTRL:
+        return CTRL_SUBTYPE_NAMES.get(subtype, f'ctrl_{subtype}')
+    if frame_type == FRAME_TYPE_DATA:
+        return 'qos_data' if subtype & 0x08 else 'data'
+    return None
+
+
+def kind_matcher(types=None, subtypes=None):
+    """把类型 / 子类型过滤条件转换为匹配类型码字节的正则，无过滤时返回 None"""
+    if not types and not subtypes:
+        return None
+    allowed = []
+    for kind in range(256):
+        if kind & KIND_UNDECODABLE:
+            continue
+        frame_type = (kind >> 4) & 0x3
+        name = subtype_name(frame_type, kind & 0x0f)
+        if types and not (FRAME_TYPE_NAMES.get(frame_type) in types
+                          or ('eapol' in types and kind & KIND_EAPOL)):
+            continue
+        if subtypes and name not in subtypes:
+            continue
+        allowed.append(re.escape(bytes([kind])))
+    return re.compile(b'[' + b''.join(allowed) + b']') if allowed else re.compile(b'(?!)')
+
+
+def build_index(cap_path, index_path):
+    """单次流式遍历捕获文件，写出帧偏移与类型码"""
+    cap_path = Path(cap_path)
+    stat = cap_path.stat()
+    tmp_path = index_path.with_name(index_path.name + '.tmp')
+    kinds = bytearray()
+    with open(cap_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        reader = PcapReader(src)
+        dst.write(b'\0' * _INDEX_HEADER.size)
+        for record in reader:
+            dst.write(_OFFSET.pack(record.offset))
+            kinds.append(_frame_kind(decode_80211(record.data, reader.linktype)))
+        dst.write(kinds)
+        dst.seek(0)
+        dst.write(_INDEX_HEADER.pack(
+            INDEX_MAGIC, INDEX_VERSION, reader.linktype,
+            stat.st_size, stat.st_mtime_ns, len(kinds), reader.truncated
+        ))
+    os.replace(tmp_path, index_path)
+    logger.info("已建立帧索引: %s (%s 帧)", cap_path.name, len(kinds))
+
+
+class FrameIndex:
+    """只读映射的帧索引，帧摘要在读取时才解码"""
+
+    def __init__(self, cap_path, index_path):
+        self.cap_path = Path(cap_path)
+        self.loaded_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._refs = 0          # 正在使用的请求数，归零且已淘汰时才关闭映射
+        self._retired = False
+        self._file = open(index_path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.linktype, self.size, self.mtime_ns,
+         self.count, truncated) = _INDEX_HEADER.unpack_from(self._map)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise PcapError('帧索引格式不兼容')
+        self.truncated = bool(truncated)
+        self._kinds_start = _INDEX_HEADER.size + self.count * _OFFSET.size
+
+    def is_current(self, stat):
+        return self.size == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+    def is_usable(self, stat):
+        """文件未变化，或仍在追加写入且索引建立不久：已有帧的偏移不变，可以继续使用"""
+        if self.is_current(stat):
+            return True
+        return stat.st_size >= self.size and time.monotonic() - self.loaded_at < REBUILD_INTERVAL
+
+    def acquire(self):
+        with self._lock:
+            self._refs += 1
+
+    def release(self):
+        with self._lock:
+            self._refs -= 1
+            closing = self._retired and not self._refs
+        if closing:
+            self.close()
+
+    def retire(self):
+        """从缓存中移除；仍有请求在使用时延迟到最后一次 release 再关闭"""
+        with self._lock:
+            self._retired = True
+            closing = not self._refs
+        if closing:
+            self.close()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def offset(self, number):
+        return _OFFSET.unpack_from(self._map, _INDEX_HEADER.size + number * _OFFSET.size)[0]
+
+    def find(self, start, limit, matcher=None):
+        """从 start 开始找出最多 limit 个匹配帧的序号，返回 (序号列表, 下一个游标)"""
+        if matcher is None:
+            end = min(start + limit, self.count)
+            return list(range(start, end)), (end if end < self.count else None)
+
+        numbers = []
+        kinds_end = self._kinds_start + self.count
+        pos = self._kinds_start + start
+        while len(numbers) < limit:
+            match = matcher.search(self._map, pos, kinds_end)
+            if match is None:
+                return numbers, None
+            numbers.append(match.start() - self._kinds_start)
+            pos = match.start() + 1
+        next_cursor = pos - self._kinds_start
+        return numbers, (next_cursor if next_cursor < self.count else None)
+
+    def summaries(self, numbers):
+        """读取并解码指定帧的摘要"""
+        if not numbers:
+            return []
+        frames = []
+        with open(self.cap_path, 'rb') as f:
+            reader = PcapReader(f)
+            first_ts = reader.read_record(self.offset(0)).ts
+            for number in numbers:
+                record = reader.read_record(self.offset(number))
+                frame = decode_80211(record.data, self.linktype)
+                summary = {
+                    'number': number + 1,
+                    'offset': record.offset,
+                    'time': record.ts,
+                    'relative_time': round(record.ts - first_ts, 6),
+                    'length': record.orig_len,
+                    'rssi': radiotap_signal(record.data, self.linktype)
+                }
+                if frame is not None:
+                    summary.update({
+                        'type': FRAME_TYPE_NAMES.get(frame.type),
+                        'subtype': subtype_name(frame.type, frame.subtype),
+                        'addr1': frame.addr1,
+                        'addr2': frame.addr2,
+                        'addr3': frame.addr3,
+                        'bssid': frame.bssid,
+                        'protected': bool(frame.flags & 0x40),
+                        'eapol_msg': frame.eapol_msg
+                    })
+                frames.append(summary)
+        return frames
+
+
+class FrameIndexStore:
+    """按捕获文件缓存帧索引，文件变化后自动重建"""
+
+    def __init__(self, index_dir):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self._open = OrderedDict()  # 文件名 -> FrameIndex，最近使用的在末尾
+
+    def _index_path(self, filename):
+        return self.index_dir / (filename + INDEX_SUFFIX)
+
+    def _cached(self, filename, stat):
+        with self._lock:
+            index = self._open.get(filename)
+            if index is not None and index.is_usable(stat):
+                self._open.move_to_end(filename)
+                index.acquire()
+                return index
+        return None
+
+    @contextmanager
+    def open(self, cap_path):
+        """使用捕获文件的帧索引，期间映射不会因 LRU 淘汰或重建而关闭"""
+        index = self._checkout(cap_path)
+        try:
+            yield index
+        finally:
+            index.release()
+
+    def prepare(self, cap_path):
+        """预先建立帧索引"""
+        self._checkout(cap_path).release()
+
+    def _checkout(self, cap_path):
+        """获取并引用帧索引，必要时建立（每个文件只会有一个线程在建立）"""
+        cap_path = Path(cap_path)
+        filename = cap_path.name
+        stat = cap_path.stat()
+        index = self._cached(filename, stat)
+        if index is not None:
+            return index
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(filename, threading.Lock())
+        with build_lock:
+            index = self._cached(filename, stat)
+            if index is not None:
+                return index
+
+            index_path = self._index_path(filename)
+            index = None
+            if index_path.exists():
+                try:
+                    index = FrameIndex(cap_path, index_path)
+                    if not index.is_current(stat):
+                        index.close()
+                        index = None
+                except (OSError, ValueError, struct.error, PcapError):
+                    index = None
+            if index is None:
+                build_index(cap_path, index_path)
+                index = FrameIndex(cap_path, index_path)
+
+            with self._lock:
+                old = self._open.pop(filename, None)
+                if old is not None:
+                    old.retire()
+                self._open[filename] = index
+                index.acquire()
+                while len(self._open) > MAX_OPEN_INDEXES:
+                    _, evicted = self._open.popitem(last=False)
+                    evicted.retire()
+            return index
+
+    def remove(self, filename):
+        """删除捕获文件时一并删除其索引"""
+        with self._lock:
+            index = self._open.pop(filename, None)
+            self._build_locks.pop(filename, None)
+        if index is not None:
+            index.retire()
+        try:
+            self._index_path(filename).unlink()
+        except FileNotFoundError:
+            pass
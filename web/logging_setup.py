@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Logging Setup - 基于队列的非阻塞日志、JSON 格式、文件滚动与内存环形缓冲"""
+
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+LOG_DIR = os.environ.get('LOG_DIR', '/var/log/wifi-capture')
+LOG_FILE = 'wifi-capture.log'          # 由这里负责滚动；OpenRC 重定向的 app.log 只保留未经 logging 的输出
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')  # text / json
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_BUFFER_SIZE = 2000                 # 内存环形缓冲保留的条数
+
+# LogRecord 自带的属性，其余属性视为 extra 结构化字段
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def record_to_dict(record):
+    """把 LogRecord 转换为结构化字典"""
+    entry = {
+        'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+        'timestamp': record.created,
+        'level': record.levelname,
+        'logger': record.name,
+        'thread': record.threadName,
+        'message': record.getMessage()
+    }
+    for key, value in vars(record).items():
+        if key not in _RECORD_ATTRS and not key.startswith('_'):
+            entry[key] = value
+    if record.exc_info:
+        entry['exception'] = logging.Formatter().formatException(record.exc_info)
+    elif record.exc_text:
+        entry['exception'] = record.exc_text
+    return entry
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """入队前只展开消息参数，异常堆栈单独保存在 exc_text 中"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps(record_to_dict(record), ensure_ascii=False, default=str)
+
+
+class LogRingBuffer(logging.Handler):
+    """保留最近的日志记录，供 /api/logs 查询与实时跟踪"""
+
+    def __init__(self, capacity=LOG_BUFFER_SIZE):
+        super().__init__()
+        self._cond = threading.Condition()
+        self._records = deque(maxlen=capacity)
+        self._seq = 0
+
+    @property
+    def seq(self):
+        with self._cond:
+            return self._seq
+
+    def emit(self, record):
+        try:
+            entry = record_to_dict(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._cond:
+            self._seq += 1
+            entry['seq'] = self._seq
+            self._records.append(entry)
+            self._cond.notify_all()
+
+    def query(self, level=None, since=None, after_seq=None, logger=None, limit=200):
+        """按级别 / 时间 / 序号过滤，返回最新的 limit 条"""
+        min_level = logging.getLevelName(level.upper()) if level else 0
+        if not isinstance(min_level, int):
+            min_level = 0
+        with self._cond:
+            records = list(self._records)
+        result = [
+            r for r in records
+            if logging.getLevelName(r['level']) >= min_level
+            and (since is None or r['timestamp'] > since)
+            and (after_seq is None or r['seq'] > after_seq)
+            and (logger is None or r['logger'].startswith(logger))
+        ]
+        return result[-limit:] if limit else result
+
+    def wait(self, after_seq, timeout=None):
+        """阻塞直到有 after_seq 之后的记录或超时，返回最新序号"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > after_seq, timeout)
+            return self._seq
+
+
+# 全局实例
+log_buffer = LogRingBuffer()
+_listener = None
+
+
+def setup_logging():
+    """配置根日志器：业务线程只把记录放入队列，由后台线程写出"""
+    global _listener
+    if _listener is not None:
+        return
+
+    if LOG_FORMAT == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s %(levelname)-7s [%(threadName)s] %(name)s: %(message)s')
+
+    handlers = [log_buffer]
+    file_handler = None
+
+    try:
+        Path(LOG_DIR).mkdir(parents=True, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            Path(LOG_DIR) / LOG_FILE,
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    except OSError as e:
+        sys.stderr.write(f"Log file unavailable, logging to stdout only: {e}\n")
+
+    # 服务方式运行时 stdout 被重定向到不滚动的 app.log，已写入滚动文件时不再重复输出
+    if file_handler is None or sys.stdout.isatty():
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(_QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    # werkzeug 的访问日志过于频繁，只保留警告
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+
+def shutdown_logging():
+    """停止后台线程并写出剩余记录"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
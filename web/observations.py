@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Observation Log - 按天滚动追加每个 BSSID 的观测记录，供离线分析导出"""
+
+import csv
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+OBSERVATION_FIELDS = ['timestamp', 'bssid', 'channel', 'power', 'encryption', 'cipher', 'auth', 'essid']
+OBSERVATION_RETENTION_DAYS = 30  # 按天的观测文件保留天数
+
+
+class ObservationLog:
+    def __init__(self, log_dir):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._last_seen = {}  # BSSID -> airodump 的"最后出现时间"，未变化则不重复记录
+        self._file = None
+        self._writer = None
+        self._file_day = None
+
+    def _get_writer(self, timestamp):
+        day = datetime.fromtimestamp(timestamp).strftime('%Y%m%d')
+        if day != self._file_day:
+            if self._file:
+                self._file.close()
+            path = self.log_dir / f"obs_{day}.csv"
+            is_new = not path.exists()
+            self._file = open(path, 'a', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            if is_new:
+                self._writer.writerow(OBSERVATION_FIELDS)
+            self._file_day = day
+        return self._writer
+
+    def record(self, network, seen_marker):
+        """记录一次观测；seen_marker 与上次相同时视为同一观测"""
+        bssid = network['bssid']
+        with self._lock:
+            if self._last_seen.get(bssid) == seen_marker:
+                return
+            self._last_seen[bssid] = seen_marker
+            timestamp = network.get('last_seen') or time.time()
+            self._get_writer(timestamp).writerow([
+                round(timestamp, 3), bssid, network['channel'], network['power'],
+                network['encryption'], network['cipher'], network['auth'], network['essid']
+            ])
+
+    def forget(self, bssids):
+        """移除已过期网络的去重记录"""
+        with self._lock:
+            for bssid in bssids:
+                self._last_seen.pop(bssid, None)
+
+    def purge_expired(self, retention_days=OBSERVATION_RETENTION_DAYS):
+        """删除超过保留天数的观测文件，返回删除数量"""
+        cutoff_day = datetime.fromtimestamp(time.time() - retention_days * 86400).strftime('%Y%m%d')
+        deleted = 0
+        with self._lock:
+            for path in self.log_dir.glob('obs_*.csv'):
+                day = path.stem[4:]
+                if day >= cutoff_day or day == self._file_day:
+                    continue
+                try:
+                    path.unlink()
+                    deleted += 1
+                except OSError:
+                    pass
+        return deleted
+
+    def flush(self):
+        """把缓冲的记录写入磁盘"""
+        with self._lock:
+            if self._file:
+                self._file.flush()
+
+    def iter_observations(self, since=None, until=None, bssid=None):
+        """按时间顺序逐条读取观测记录，内存占用与历史长度无关"""
+        self.flush()
+        since_day = datetime.fromtimestamp(since).strftime('%Y%m%d') if since else None
+        until_day = datetime.fromtimestamp(until).strftime('%Y%m%d') if until else None
+        bssid = bssid.upper() if bssid else None
+
+        for path in sorted(self.log_dir.glob('obs_*.csv')):
+            day = path.stem[4:]
+            if (since_day and day < since_day) or (until_day and day > until_day):
+                continue
+            with open(path, 'r', newline='', encoding='utf-8', errors='replace') as f:
+                for row in csv.DictReader(f):
+                    try:
+                        timestamp = float(row['timestamp'])
+                        if (since and timestamp < since) or (until and timestamp > until):
+                            continue
+                        if bssid and row['bssid'] != bssid:
+                            continue
+                        row['timestamp'] = timestamp
+                        row['channel'] = int(row['channel'])
+                        row['power'] = int(row['power'])
+                    except (KeyError, TypeError, ValueError):
+                        continue  # 跳过写入中断的残行
+                    yield row
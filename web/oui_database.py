@@ -2,8 +2,17 @@
 """OUI Database - 根据 MAC 地址识别路由器厂商"""
 
 import json
+import logging
+import marshal
+import os
+import sys
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = '.idx'  # 预构建索引（marshal 格式），加载比解析 JSON 快，镜像构建时生成
+
+
 class OUIDatabase:
     def __init__(self, db_path=None):
         if db_path is None:
@@ -14,16 +23,55 @@ class OUIDatabase:
         self.default = {"name": "Unknown", "logo": "unknown.svg"}
         self._load_database()
     
+    @property
+    def index_path(self):
+        return self.db_path.with_suffix(INDEX_SUFFIX)
+    
     def _load_database(self):
-        """加载 OUI 数据库"""
+        """加载 OUI 数据库，优先使用与源文件匹配的预构建索引"""
+        if self._load_index():
+            return
         try:
             if self.db_path.exists():
                 with open(self.db_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     self.vendors = data.get('vendors', {})
                     self.default = data.get('default', self.default)
+                self.build_index()
         except Exception as e:
-            print(f"Error loading OUI database: {e}")
+            logger.error("Error loading OUI database: %s", e)
+    
+    def _load_index(self):
+        """加载预构建索引；源文件已更新或解释器版本不同则返回 False"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = marshal.load(f)
+            if (data.get('source_mtime') != self.db_path.stat().st_mtime_ns
+                    or data.get('python') != sys.hexversion):
+                return False
+        except (OSError, EOFError, ValueError, TypeError, AttributeError):
+            return False
+        self.vendors = data['vendors']
+        self.default = data['default']
+        return True
+    
+    def build_index(self):
+        """根据当前数据生成预构建索引（原子写入），失败时不影响使用"""
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        try:
+            data = {
+                'source_mtime': self.db_path.stat().st_mtime_ns,
+                'python': sys.hexversion,
+                'vendors': self.vendors,
+                'default': self.default
+            }
+            with open(tmp_path, 'wb') as f:
+                marshal.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+            return True
+        except OSError as e:
+            logger.warning("无法写入 OUI 预构建索引: %s", e)
+            return False
     
     def lookup(self, mac_address):
         """根据 MAC 地址查找厂商信息"""
@@ -62,3 +110,10 @@ class OUIDatabase:
 
 # 全局实例
 oui_db = OUIDatabase()
+
+
+if __name__ == '__main__':
+    # 镜像构建时预生成索引: python3 oui_database.py --build
+    if '--build' in sys.argv[1:]:
+        logging.basicConfig(level=logging.INFO)
+        sys.exit(0 if oui_db.vendors and oui_db.build_index() else 1)
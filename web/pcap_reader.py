@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""PCAP Reader - 流式读取/写入 pcap 文件并解析 802.11 帧头"""
+
+import struct
+from collections import namedtuple
+
+# pcap 魔数 -> (字节序, 是否纳秒时间戳)
+PCAP_MAGICS = {
+    b'\xd4\xc3\xb2\xa1': ('<', False),
+    b'\xa1\xb2\xc3\xd4': ('>', False),
+    b'\x4d\x3c\xb2\xa1': ('<', True),
+    b'\xa1\xb2\x3c\x4d': ('>', True),
+}
+
+PCAP_GLOBAL_HEADER_LEN = 24
+PCAP_RECORD_HEADER_LEN = 16
+MAX_RECORD_LEN = 262144  # 超过此长度视为损坏的记录
+
+# 链路类型
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_IEEE802_11_RADIOTAP = 127
+
+# 802.11 帧类型
+FRAME_TYPE_MGMT = 0
+FRAME_TYPE_CTRL = 1
+FRAME_TYPE_DATA = 2
+
+# 管理帧子类型
+SUBTYPE_ASSOC_REQ = 0
+SUBTYPE_REASSOC_REQ = 2
+SUBTYPE_PROBE_REQ = 4
+SUBTYPE_PROBE_RESP = 5
+SUBTYPE_BEACON = 8
+
+# LLC/SNAP + EtherType 0x888E (EAPOL)
+EAPOL_LLC_SNAP = b'\xaa\xaa\x03\x00\x00\x00\x88\x8e'
+EAPOL_TYPE_KEY = 3
+
+# EAPOL-Key Key Information 标志位
+KEY_INFO_INSTALL = 0x0040
+KEY_INFO_ACK = 0x0080
+KEY_INFO_MIC = 0x0100
+KEY_INFO_SECURE = 0x0200
+
+# radiotap 字段 (对齐, 长度)，按 present 位顺序，解析到天线信号 (bit 5) 为止
+RADIOTAP_FIELDS = ((8, 8), (1, 1), (1, 1), (2, 4), (1, 2), (1, 1))
+RADIOTAP_ANTENNA_SIGNAL = 5
+
+PcapRecord = namedtuple('PcapRecord', ['offset', 'header', 'ts', 'data', 'orig_len'])
+Dot11Frame = namedtuple('Dot11Frame', [
+    'type', 'subtype', 'flags', 'addr1', 'addr2', 'addr3', 'bssid', 'is_eapol', 'eapol_msg'
+])
+
+
+class PcapError(Exception):
+    """pcap 文件格式错误"""
+
+
+def _format_mac(raw):
+    return ':'.join(f'{b:02X}' for b in raw)
+
+
+class PcapReader:
+    """逐条读取 pcap 记录，内存占用只与单条记录大小有关
+
+    遇到被截断的尾部记录时停止迭代，并设置 truncated=True；
+    valid_end 始终指向最后一条完整记录之后的偏移。
+    """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        header = fileobj.read(PCAP_GLOBAL_HEADER_LEN)
+        if len(header) < PCAP_GLOBAL_HEADER_LEN or header[:4] not in PCAP_MAGICS:
+            raise PcapError('不是有效的 pcap 文件')
+
+        self.global_header = header
+        self.endian, self.nanosecond = PCAP_MAGICS[header[:4]]
+        _, _, _, _, self.snaplen, self.linktype = struct.unpack(self.endian + 'HHiIII', header[4:])
+        self._record_struct = struct.Struct(self.endian + 'IIII')
+        self.truncated = False
+        self.valid_end = PCAP_GLOBAL_HEADER_LEN
+
+    def read_record(self, offset):
+        """随机读取指定偏移处的单条记录（配合帧偏移索引使用）"""
+        self.fileobj.seek(offset)
+        header = self.fileobj.read(PCAP_RECORD_HEADER_LEN)
+        if len(header) < PCAP_RECORD_HEADER_LEN:
+            raise PcapError(f'偏移 {offset} 处的记录不完整')
+        ts_sec, ts_frac, incl_len, orig_len = self._record_struct.unpack(header)
+        if incl_len > MAX_RECORD_LEN:
+            raise PcapError(f'偏移 {offset} 处的记录长度无效')
+        data = self.fileobj.read(incl_len)
+        divisor = 1e9 if self.nanosecond else 1e6
+        return PcapRecord(offset, header, ts_sec + ts_frac / divisor, data, orig_len)
+
+    def __iter__(self):
+        offset = self.valid_end
+        divisor = 1e9 if self.nanosecond else 1e6
+        while True:
+            header = self.fileobj.read(PCAP_RECORD_HEADER_LEN)
+            if not header:
+                return
+            if len(header) < PCAP_RECORD_HEADER_LEN:
+                self.truncated = True
+                return
+
+            ts_sec, ts_frac, incl_len, orig_len = self._record_struct.unpack(header)
+            if incl_len > MAX_RECORD_LEN:
+                self.truncated = True
+                return
+
+            data = self.fileobj.read(incl_len)
+            if len(data) < incl_len:
+                self.truncated = True
+                return
+
+            yield PcapRecord(offset, header, ts_sec + ts_frac / divisor, data, orig_len)
+            offset += PCAP_RECORD_HEADER_LEN + incl_len
+            self.valid_end = offset
+
+
+class PcapWriter:
+    """按源文件的全局头原样写出记录"""
+
+    def __init__(self, fileobj, global_header):
+        self.fileobj = fileobj
+        self.fileobj.write(global_header)
+        self.count = 0
+
+    def write(self, record):
+        self.fileobj.write(record.header)
+        self.fileobj.write(record.data)
+        self.count += 1
+
+
+def strip_radiotap(data, linktype):
+    """去掉 radiotap 头，返回 802.11 帧；不支持的链路类型返回 None"""
+    if linktype == LINKTYPE_IEEE802_11:
+        return data
+    if linktype == LINKTYPE_IEEE802_11_RADIOTAP:
+        if len(data) < 4:
+            return None
+        rt_len = struct.unpack_from('<H', data, 2)[0]
+        return data[rt_len:]
+    return None
+
+
+def radiotap_signal(data, linktype):
+    """从 radiotap 头读取天线信号强度 (dBm)，没有该字段时返回 None"""
+    if linktype != LINKTYPE_IEEE802_11_RADIOTAP or len(data) < 8:
+        return None
+    rt_len = struct.unpack_from('<H', data, 2)[0]
+    present = struct.unpack_from('<I', data, 4)[0]
+    if not present & (1 << RADIOTAP_ANTENNA_SIGNAL):
+        return None
+
+    # 跳过扩展的 present 位图
+    pos = 8
+    word = present
+    while word & 0x80000000:
+        if pos + 4 > rt_len:
+            return None
+        word = struct.unpack_from('<I', data, pos)[0]
+        pos += 4
+
+    for bit, (align, size) in enumerate(RADIOTAP_FIELDS):
+        if not present & (1 << bit):
+            continue
+        pos = (pos + align - 1) & ~(align - 1)
+        if bit == RADIOTAP_ANTENNA_SIGNAL:
+            if pos + 1 > min(rt_len, len(data)):
+                return None
+            return struct.unpack_from('b', data, pos)[0]
+        pos += size
+    return None
+
+
+def eapol_message_number(frame, offset):
+    """根据 EAPOL-Key 的 Key Information 判断四次握手的第几条消息 (1-4)"""
+    # LLC/SNAP(8) + EAPOL 头(4) + 描述符类型(1) 之后是 Key Information
+    if len(frame) < offset + 15 or frame[offset + 9] != EAPOL_TYPE_KEY:
+        return None
+    key_info = struct.unpack_from('>H', frame, offset + 13)[0]
+    ack = key_info & KEY_INFO_ACK
+    mic = key_info & KEY_INFO_MIC
+    if ack and not mic:
+        return 1
+    if ack and mic and key_info & KEY_INFO_INSTALL:
+        return 3
+    if mic and not ack:
+        return 4 if key_info & KEY_INFO_SECURE else 2
+    return None
+
+
+def decode_80211(data, linktype):
+    """解析 802.11 帧头，无法解析时返回 None"""
+    frame = strip_radiotap(data, linktype)
+    if frame is None or len(frame) < 10:
+        return None
+
+    fc = frame[0]
+    flags = frame[1]
+    frame_type = (fc >> 2) & 0x3
+    subtype = (fc >> 4) & 0xf
+
+    addr1 = _format_mac(frame[4:10])
+    addr2 = _format_mac(frame[10:16]) if len(frame) >= 16 else None
+    addr3 = _format_mac(frame[16:22]) if len(frame) >= 22 else None
+
+    to_ds = flags & 0x01
+    from_ds = flags & 0x02
+    if frame_type == FRAME_TYPE_DATA:
+        if to_ds and not from_ds:
+            bssid = addr1
+        elif from_ds and not to_ds:
+            bssid = addr2
+        elif not to_ds and not from_ds:
+            bssid = addr3
+        else:
+            bssid = None  # WDS
+    elif frame_type == FRAME_TYPE_MGMT:
+        bssid = addr3
+    else:
+        bssid = None
+
+    is_eapol = False
+    eapol_msg = None
+    if frame_type == FRAME_TYPE_DATA and not flags & 0x40:  # 受保护的帧不可能是明文 EAPOL
+        hdr_len = 24
+        if to_ds and from_ds:
+            hdr_len += 6
+        if subtype & 0x08:  # QoS Data
+            hdr_len += 2
+            if flags & 0x80:  # HT Control
+                hdr_len += 4
+        is_eapol = frame[hdr_len:hdr_len + 8] == EAPOL_LLC_SNAP
+        if is_eapol:
+            eapol_msg = eapol_message_number(frame, hdr_len)
+
+    return Dot11Frame(frame_type, subtype, flags, addr1, addr2, addr3, bssid, is_eapol, eapol_msg)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""Profiler - 按请求采样/cProfile 分析、慢请求日志与 tracemalloc 内存快照"""
+
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict, deque
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'           # 请求头开启分析: sample / cprofile
+PROFILE_MODES = ('sample', 'cprofile')
+SLOW_REQUEST_THRESHOLD = 0.5           # 慢请求阈值（秒）
+SLOW_SAMPLE_AFTER = 0.1                # 请求运行超过此时间后开始后台采样，用于慢请求日志
+SAMPLE_INTERVAL = 0.005                # 显式采样模式的采样间隔（秒）
+WATCHDOG_INTERVAL = 0.02               # 慢请求采样间隔（秒）
+MAX_REPORTS = 20                       # 保留的分析报告数量
+MAX_SLOW_REQUESTS = 100                # 慢请求日志长度
+TOP_FRAMES = 5
+
+# 长连接和调试接口本身不参与分析
+EXCLUDED_ENDPOINTS = {'api.event_stream', 'api.log_stream', 'api.ws_stream'}
+EXCLUDED_PREFIXES = ('/api/debug/',)
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse_stack(frame):
+    """把调用栈转换为 flamegraph 折叠格式: root;...;leaf"""
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+class RequestProfiler:
+    def __init__(self):
+        self.enabled = False       # 管理开关：分析所有请求
+        self.mode = 'sample'
+        self.reports = OrderedDict()  # report_id -> 报告
+        self.slow_requests = deque(maxlen=MAX_SLOW_REQUESTS)
+        self._inflight = {}        # thread_id -> 采样状态
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._sampler_thread = None
+
+    def init_app(self, app):
+        """注册请求钩子"""
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def set_enabled(self, enabled, mode=None):
+        """管理开关"""
+        if mode in PROFILE_MODES:
+            self.mode = mode
+        self.enabled = bool(enabled)
+
+    # ==================== 请求钩子 ====================
+
+    def _before_request(self):
+        if request.endpoint in EXCLUDED_ENDPOINTS or request.path.startswith(EXCLUDED_PREFIXES):
+            return
+
+        mode = request.headers.get(PROFILE_HEADER, '').lower() or (self.mode if self.enabled else None)
+        if mode not in PROFILE_MODES:
+            mode = None
+
+        g.profile_start = time.perf_counter()
+        g.profile_mode = mode
+        g.profile_cprofile = None
+
+        if mode == 'cprofile':
+            try:
+                g.profile_cprofile = cProfile.Profile()
+                g.profile_cprofile.enable()
+            except ValueError:  # 已有其他分析器在运行
+                g.profile_cprofile = None
+                g.profile_mode = None
+
+        with self._lock:
+            self._inflight[threading.get_ident()] = {
+                'start': time.monotonic(),
+                'sample': mode == 'sample',
+                'stacks': Counter()
+            }
+        self._ensure_sampler()
+        self._wakeup.set()
+
+    def _after_request(self, response):
+        start = g.pop('profile_start', None)
+        if start is None:
+            return response
+
+        duration = time.perf_counter() - start
+        mode = g.pop('profile_mode', None)
+        profile = g.pop('profile_cprofile', None)
+        if profile is not None:
+            profile.disable()
+
+        with self._lock:
+            sampled = self._inflight.pop(threading.get_ident(), None)
+        stacks = sampled['stacks'] if sampled else Counter()
+
+        route = request.url_rule.rule if request.url_rule else request.path
+        report = None
+        if mode == 'cprofile' and profile is not None:
+            report = self._build_cprofile_report(profile)
+        elif mode == 'sample' or stacks:
+            report = self._build_sample_report(stacks)
+
+        if mode:
+            report_id = uuid.uuid4().hex[:12]
+            report.update({
+                'id': report_id,
+                'route': route,
+                'method': request.method,
+                'mode': mode,
+                'duration': round(duration, 4),
+                'timestamp': time.time()
+            })
+            with self._lock:
+                self.reports[report_id] = report
+                while len(self.reports) > MAX_REPORTS:
+                    self.reports.popitem(last=False)
+            response.headers['X-Profile-Id'] = report_id
+
+        if duration >= SLOW_REQUEST_THRESHOLD:
+            self.slow_requests.append({
+                'route': route,
+                'method': request.method,
+                'status': response.status_code,
+                'duration': round(duration, 4),
+                'timestamp': time.time(),
+                'top_frames': report['top_frames'] if report else []
+            })
+            logger.warning("慢请求 %s %s: %.3fs", request.method, route, duration,
+                           extra={'route': route, 'duration': round(duration, 4)})
+
+        return response
+
+    def _teardown_request(self, exc):
+        # 请求异常时 after_request 不会执行，这里兜底清理
+        with self._lock:
+            self._inflight.pop(threading.get_ident(), None)
+
+    # ==================== 采样 ====================
+
+    def _ensure_sampler(self):
+        if self._sampler_thread and self._sampler_thread.is_alive():
+            return
+        self._sampler_thread = threading.Thread(target=self._sampler_loop, daemon=True)
+        self._sampler_thread.start()
+
+    def _sampler_loop(self):
+        """后台采样线程：没有进行中的请求时阻塞等待，不占用 CPU"""
+        while True:
+            explicit = False
+            with self._lock:
+                if not self._inflight:
+                    self._wakeup.clear()
+                else:
+                    now = time.monotonic()
+                    frames = sys._current_frames()
+                    for thread_id, state in self._inflight.items():
+                        explicit = explicit or state['sample']
+                        if not state['sample'] and now - state['start'] < SLOW_SAMPLE_AFTER:
+                            continue
+                        frame = frames.get(thread_id)
+                        if frame is not None:
+                            state['stacks'][_collapse_stack(frame)] += 1
+                    del frames
+
+            if not self._wakeup.is_set():
+                self._wakeup.wait()
+                continue
+
+            time.sleep(SAMPLE_INTERVAL if explicit else WATCHDOG_INTERVAL)
+
+    # ==================== 报告 ====================
+
+    def _build_sample_report(self, stacks):
+        leaf_counts = Counter()
+        for stack, count in stacks.items():
+            leaf_counts[stack.rsplit(';', 1)[-1]] += count
+        return {
+            'samples': sum(stacks.values()),
+            'top_frames': [
+                {'frame': frame, 'samples': count}
+                for frame, count in leaf_counts.most_common(TOP_FRAMES)
+            ],
+            'collapsed': '\n'.join(f"{stack} {count}" for stack, count in stacks.most_common())
+        }
+
+    def _build_cprofile_report(self, profile):
+        """cProfile 结果按 调用者;被调用者 折叠，权重为微秒"""
+        stats = pstats.Stats(profile).stats
+        edges = Counter()
+        by_tottime = []
+        for func, (cc, nc, tt, ct, callers) in stats.items():
+            label = f"{func[2]} ({os.path.basename(func[0])}:{func[1]})"
+            by_tottime.append((tt, label))
+            if not callers:
+                edges[label] += int(tt * 1e6)
+            for caller, caller_stats in callers.items():
+                caller_label = f"{caller[2]} ({os.path.basename(caller[0])}:{caller[1]})"
+                edges[f"{caller_label};{label}"] += int(caller_stats[2] * 1e6)
+        by_tottime.sort(reverse=True)
+        return {
+            'top_frames': [
+                {'frame': label, 'tottime': round(tt, 6)}
+                for tt, label in by_tottime[:TOP_FRAMES]
+            ],
+            'collapsed': '\n'.join(f"{stack} {weight}" for stack, weight in edges.most_common() if weight > 0)
+        }
+
+    def get_report(self, report_id):
+        """获取分析报告"""
+        with self._lock:
+            return self.reports.get(report_id)
+
+    def list_reports(self):
+        """报告摘要列表（不含折叠栈）"""
+        with self._lock:
+            return [
+                {k: v for k, v in report.items() if k != 'collapsed'}
+                for report in reversed(self.reports.values())
+            ]
+
+    def get_slow_requests(self):
+        """慢请求日志"""
+        return list(self.slow_requests)
+
+
+class MemoryTracker:
+    """tracemalloc 快照与差异，用于排查长时间运行进程的内存增长"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_snapshot = None
+
+    @property
+    def is_tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self, nframes=10):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(nframes)
+            self._last_snapshot = None
+
+    def stop(self):
+        with self._lock:
+            tracemalloc.stop()
+            self._last_snapshot = None
+
+    def snapshot(self, limit=20):
+        """拍摄快照，返回占用最多的位置及与上次快照的差异"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                return None
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ))
+            current, peak = tracemalloc.get_traced_memory()
+            result = {
+                'traced_current': current,
+                'traced_peak': peak,
+                'top': [
+                    {'location': str(stat.traceback), 'size': stat.size, 'count': stat.count}
+                    for stat in snapshot.statistics('lineno')[:limit]
+                ],
+                'diff': None
+            }
+            if self._last_snapshot is not None:
+                result['diff'] = [
+                    {'location': str(stat.traceback), 'size_diff': stat.size_diff,
+                     'count_diff': stat.count_diff, 'size': stat.size}
+                    for stat in snapshot.compare_to(self._last_snapshot, 'lineno')[:limit]
+                ]
+            self._last_snapshot = snapshot
+            return result
+
+
+# 全局实例
+request_profiler = RequestProfiler()
+memory_tracker = MemoryTracker()
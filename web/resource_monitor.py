@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""Resource Monitor - 后台读取 /proc 采样面板进程与其子进程的 CPU、内存、IO 与文件描述符"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL = 5        # 采样间隔（秒）
+HISTORY_SIZE = 720         # 保留的采样数（默认约 1 小时）
+PROC_DIR = '/proc'
+
+try:
+    CLK_TCK = os.sysconf('SC_CLK_TCK')
+except (AttributeError, ValueError, OSError):
+    CLK_TCK = 100
+
+
+def _read(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_stat(pid):
+    """解析 /proc/<pid>/stat，返回 (名称, 状态, ppid, CPU ticks, 子进程 CPU ticks, 线程数, 启动时刻)"""
+    stat = _read(f'{PROC_DIR}/{pid}/stat')
+    if not stat:
+        return None
+    try:
+        # comm 可能包含空格和括号，以最后一个 ')' 分隔
+        name = stat[stat.index('(') + 1:stat.rindex(')')]
+        fields = stat[stat.rindex(')') + 2:].split()
+        return {
+            'name': name,
+            'state': fields[0],
+            'ppid': int(fields[1]),
+            'cpu_ticks': int(fields[11]) + int(fields[12]),
+            'children_ticks': int(fields[13]) + int(fields[14]),
+            'threads': int(fields[17]),
+            'starttime': int(fields[19])
+        }
+    except (ValueError, IndexError):
+        return None
+
+
+def read_status_memory(pid):
+    """从 /proc/<pid>/status 读取 VmRSS / VmSize (kB)"""
+    status = _read(f'{PROC_DIR}/{pid}/status')
+    memory = {}
+    if status:
+        for line in status.splitlines():
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'VmSize'):
+                memory[key] = int(value.split()[0])
+    return memory.get('VmRSS', 0), memory.get('VmSize', 0)
+
+
+def read_io(pid):
+    """从 /proc/<pid>/io 读取实际读写字节数，无权限时返回 (None, None)"""
+    io = _read(f'{PROC_DIR}/{pid}/io')
+    if not io:
+        return None, None
+    values = {}
+    for line in io.splitlines():
+        key, _, value = line.partition(':')
+        values[key] = value.strip()
+    try:
+        return int(values['read_bytes']), int(values['write_bytes'])
+    except (KeyError, ValueError):
+        return None, None
+
+
+def count_fds(pid):
+    try:
+        return len(os.listdir(f'{PROC_DIR}/{pid}/fd'))
+    except OSError:
+        return None
+
+
+def read_cmdline(pid):
+    cmdline = _read(f'{PROC_DIR}/{pid}/cmdline')
+    return cmdline.replace('\0', ' ').strip() if cmdline else ''
+
+
+def find_descendants(root_pid):
+    """遍历 /proc 找出 root_pid 的所有后代进程"""
+    children = {}
+    try:
+        entries = os.listdir(PROC_DIR)
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        stat = read_stat(entry)
+        if stat:
+            children.setdefault(stat['ppid'], []).append(int(entry))
+
+    result = []
+    queue = list(children.get(root_pid, []))
+    while queue:
+        pid = queue.pop()
+        result.append(pid)
+        queue.extend(children.get(pid, []))
+    return result
+
+
+class ResourceSampler:
+    def __init__(self, interval=SAMPLE_INTERVAL, history_size=HISTORY_SIZE):
+        self.interval = interval
+        self.pid = os.getpid()
+        self.history = deque(maxlen=history_size)
+        self.exited = {}       # 进程名 -> 已退出进程累计的 CPU 秒数与写入字节
+        self._previous = {}    # (pid, starttime) -> 上次采样的累计值，用于计算速率
+        self._cmdlines = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def available(self):
+        return os.path.exists(f'{PROC_DIR}/self/stat')
+
+    def start(self):
+        """启动后台采样线程"""
+        if self._thread is not None:
+            return
+        if not self.available:
+            logger.warning("/proc 不可用，资源采样已禁用")
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.exception("Resource sampling error: %s", e)
+            if self._stop_event.wait(self.interval):
+                break
+
+    def _sample_process(self, pid, now, seen):
+        stat = read_stat(pid)
+        if stat is None:
+            return None
+        key = (pid, stat['starttime'])
+        seen.add(key)
+        rss_kb, vm_kb = read_status_memory(pid)
+        read_bytes, write_bytes = read_io(pid)
+
+        previous = self._previous.get(key)
+        cpu_percent = read_rate = write_rate = None
+        if previous:
+            elapsed = now - previous['time']
+            if elapsed > 0:
+                cpu_percent = round((stat['cpu_ticks'] - previous['cpu_ticks']) / CLK_TCK / elapsed * 100, 1)
+                if read_bytes is not None and previous['read_bytes'] is not None:
+                    read_rate = round((read_bytes - previous['read_bytes']) / elapsed)
+                    write_rate = round((write_bytes - previous['write_bytes']) / elapsed)
+        self._previous[key] = {
+            'time': now,
+            'name': stat['name'],
+            'cpu_ticks': stat['cpu_ticks'],
+            'read_bytes': read_bytes,
+            'write_bytes': write_bytes
+        }
+        if key not in self._cmdlines:
+            self._cmdlines[key] = read_cmdline(pid)
+
+        return {
+            'pid': pid,
+            'ppid': stat['ppid'],
+            'name': stat['name'],
+            'cmdline': self._cmdlines[key],
+            'state': stat['state'],
+            'threads': stat['threads'],
+            'cpu_seconds': round(stat['cpu_ticks'] / CLK_TCK, 2),
+            'cpu_percent': cpu_percent,
+            'rss_kb': rss_kb,
+            'vm_kb': vm_kb,
+            'fds': count_fds(pid),
+            'read_bytes': read_bytes,
+            'write_bytes': write_bytes,
+            'read_rate': read_rate,
+            'write_rate': write_rate
+        }
+
+    def sample(self):
+        """采样一次面板进程与全部后代进程"""
+        now = time.time()
+        seen = set()
+        with self._lock:
+            panel = self._sample_process(self.pid, now, seen)
+            children = []
+            for pid in find_descendants(self.pid):
+                info = self._sample_process(pid, now, seen)
+                if info is not None:
+                    children.append(info)
+
+            # 已退出的进程：把最后一次看到的累计值计入按名称的汇总
+            for key in list(self._previous):
+                if key not in seen:
+                    last = self._previous.pop(key)
+                    self._cmdlines.pop(key, None)
+                    totals = self.exited.setdefault(last['name'], {'count': 0, 'cpu_seconds': 0.0, 'write_bytes': 0})
+                    totals['count'] += 1
+                    totals['cpu_seconds'] = round(totals['cpu_seconds'] + last['cpu_ticks'] / CLK_TCK, 2)
+                    totals['write_bytes'] += last['write_bytes'] or 0
+
+            stat = read_stat(self.pid)
+            sample = {
+                'timestamp': now,
+                'panel': panel,
+                'children': children,
+                # 面板已回收的子进程（含两次采样之间结束的短命令）累计 CPU
+                'reaped_children_cpu_seconds': round(stat['children_ticks'] / CLK_TCK, 2) if stat else None,
+                'totals': {
+                    'processes': len(children) + 1,
+                    'cpu_percent': round(sum(p['cpu_percent'] or 0 for p in [panel] + children if p), 1),
+                    'rss_kb': sum(p['rss_kb'] for p in [panel] + children if p),
+                    'fds': sum(p['fds'] or 0 for p in [panel] + children if p),
+                    'write_rate': sum(p['write_rate'] or 0 for p in [panel] + children if p)
+                }
+            }
+            self.history.append(sample)
+        return sample
+
+    def get_current(self):
+        with self._lock:
+            current = self.history[-1] if self.history else None
+            exited = {name: dict(totals) for name, totals in self.exited.items()}
+        return {
+            'interval': self.interval,
+            'running': self._thread is not None,
+            'current': current,
+            'exited': exited
+        }
+
+    def get_history(self, since=0, name=None):
+        """since 之后的采样；指定 name 时只保留面板与该名称的子进程"""
+        with self._lock:
+            samples = [s for s in self.history if s['timestamp'] > since]
+        if name:
+            samples = [
+                dict(s, children=[c for c in s['children'] if c['name'] == name])
+                for s in samples
+            ]
+        return samples
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_metrics(sampler):
+    """以 Prometheus 文本格式输出最近一次采样"""
+    info = sampler.get_current()
+    sample = info['current']
+    lines = []
+    if sample:
+        processes = ([dict(sample['panel'], role='panel')] if sample['panel'] else []) + \
+                    [dict(c, role='child') for c in sample['children']]
+        gauges = (
+            ('cpu_percent', 'cpu_percent', 'CPU usage over the last sample interval'),
+            ('rss_bytes', 'rss_kb', 'Resident set size'),
+            ('open_fds', 'fds', 'Open file descriptors'),
+            ('threads', 'threads', 'Thread count'),
+            ('read_bytes_per_second', 'read_rate', 'Disk read rate'),
+            ('write_bytes_per_second', 'write_rate', 'Disk write rate'),
+        )
+        for metric, field, help_text in gauges:
+            name = f'wifi_capture_process_{metric}'
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            for proc in processes:
+                value = proc.get(field)
+                if value is None:
+                    continue
+                if field == 'rss_kb':
+                    value *= 1024
+                labels = f'pid="{proc["pid"]}",name="{_escape_label(proc["name"])}",role="{proc["role"]}"'
+                lines.append(f'{name}{{{labels}}} {value}')
+
+        if sample['reaped_children_cpu_seconds'] is not None:
+            lines.append('# HELP wifi_capture_reaped_children_cpu_seconds_total CPU time of child processes already reaped by the panel')
+            lines.append('# TYPE wifi_capture_reaped_children_cpu_seconds_total counter')
+            lines.append(f'wifi_capture_reaped_children_cpu_seconds_total {sample["reaped_children_cpu_seconds"]}')
+
+    if info['exited']:
+        lines.append('# HELP wifi_capture_exited_process_cpu_seconds_total CPU time of sampled child processes that have exited')
+        lines.append('# TYPE wifi_capture_exited_process_cpu_seconds_total counter')
+        for name, totals in sorted(info['exited'].items()):
+            lines.append(f'wifi_capture_exited_process_cpu_seconds_total{{name="{_escape_label(name)}"}} {totals["cpu_seconds"]}')
+    return '\n'.join(lines) + '\n'
+
+
+# 全局实例
+resource_sampler = ResourceSampler()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Scanner Checkpoint - 以紧凑二进制格式保存扫描器的网络快照，重启后热启动"""
+
+import logging
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_MAGIC = b'WCSC'
+CHECKPOINT_VERSION = 1
+CHECKPOINT_INTERVAL = 30  # 扫描期间两次保存的最小间隔（秒）
+
+# 头部: 魔数, 版本, 保存时间, 正文 CRC32；正文为 zlib 压缩的记录
+_HEADER = struct.Struct('<4sHdI')
+_COUNT = struct.Struct('<I')
+_STR_LEN = struct.Struct('<H')
+# 网络: BSSID, 信道, 信号, 最后出现时间, 标志, 加密/密码/认证/ESSID 的字符串表下标
+_NETWORK = struct.Struct('<6sBbdBHHHH')
+_HIDDEN = struct.Struct('<6sH')
+_IFACES = struct.Struct('<HH')
+NO_STRING = 0xFFFF
+
+FLAG_HIDDEN = 0x01
+FLAG_REVEALED = 0x02
+
+
+def _mac_bytes(mac):
+    return bytes.fromhex(mac.replace(':', ''))
+
+
+def _mac_str(raw):
+    return ':'.join(f'{b:02X}' for b in raw)
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings = []
+        self._index = {}
+
+    def add(self, value):
+        if value is None:
+            return NO_STRING
+        if value not in self._index:
+            self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return self._index[value]
+
+    def pack(self):
+        parts = [_COUNT.pack(len(self.strings))]
+        for value in self.strings:
+            raw = value.encode('utf-8')[:0xFFFF]
+            parts.append(_STR_LEN.pack(len(raw)) + raw)
+        return b''.join(parts)
+
+
+def encode_state(state):
+    """把扫描器状态编码为二进制"""
+    table = _StringTable()
+    records = []
+
+    iface = _IFACES.pack(table.add(state.get('interface')), table.add(state.get('mon_interface')))
+
+    networks = state.get('networks', [])
+    records.append(_COUNT.pack(len(networks)))
+    for net in networks:
+        flags = (FLAG_HIDDEN if net.get('is_hidden') else 0) | (FLAG_REVEALED if net.get('revealed') else 0)
+        records.append(_NETWORK.pack(
+            _mac_bytes(net['bssid']),
+            net['channel'],
+            max(-128, min(127, net['power'])),
+            net.get('last_seen', 0),
+            flags,
+            table.add(net.get('encryption', '')),
+            table.add(net.get('cipher', '')),
+            table.add(net.get('auth', '')),
+            table.add(net.get('essid', ''))
+        ))
+
+    hidden = state.get('hidden_ssid_cache', {})
+    records.append(_COUNT.pack(len(hidden)))
+    for bssid, ssid in hidden.items():
+        records.append(_HIDDEN.pack(_mac_bytes(bssid), table.add(ssid)))
+
+    body = zlib.compress(table.pack() + iface + b''.join(records))
+    return _HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, state.get('saved_at', time.time()),
+                        zlib.crc32(body)) + body
+
+
+def decode_state(data):
+    """解码二进制快照，格式不符时抛出 ValueError"""
+    if len(data) < _HEADER.size:
+        raise ValueError('快照文件不完整')
+    magic, version, saved_at, crc = _HEADER.unpack_from(data)
+    if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+        raise ValueError('快照格式不兼容')
+    body = data[_HEADER.size:]
+    if zlib.crc32(body) != crc:
+        raise ValueError('快照校验失败')
+
+    try:
+        raw = zlib.decompress(body)
+        pos = 0
+        (count,) = _COUNT.unpack_from(raw, pos)
+        pos += _COUNT.size
+        strings = []
+        for _ in range(count):
+            (length,) = _STR_LEN.unpack_from(raw, pos)
+            pos += _STR_LEN.size
+            strings.append(raw[pos:pos + length].decode('utf-8', errors='replace'))
+            pos += length
+
+        def string(i):
+            return None if i == NO_STRING else strings[i]
+
+        interface, mon_interface = _IFACES.unpack_from(raw, pos)
+        pos += _IFACES.size
+
+        (count,) = _COUNT.unpack_from(raw, pos)
+        pos += _COUNT.size
+        networks = []
+        for _ in range(count):
+            bssid, channel, power, last_seen, flags, enc, cipher, auth, essid = _NETWORK.unpack_from(raw, pos)
+            pos += _NETWORK.size
+            networks.append({
+                'bssid': _mac_str(bssid),
+                'channel': channel,
+                'power': power,
+                'encryption': string(enc),
+                'cipher': string(cipher),
+                'auth': string(auth),
+                'essid': string(essid),
+                'clients': 0,
+                'last_seen': last_seen,
+                'is_hidden': bool(flags & FLAG_HIDDEN),
+                'revealed': bool(flags & FLAG_REVEALED)
+            })
+
+        (count,) = _COUNT.unpack_from(raw, pos)
+        pos += _COUNT.size
+        hidden = {}
+        for _ in range(count):
+            bssid, ssid = _HIDDEN.unpack_from(raw, pos)
+            pos += _HIDDEN.size
+            hidden[_mac_str(bssid)] = string(ssid)
+    except (zlib.error, struct.error, IndexError) as e:
+        raise ValueError(f'快照内容损坏: {e}')
+
+    return {
+        'saved_at': saved_at,
+        'interface': string(interface),
+        'mon_interface': string(mon_interface),
+        'networks': networks,
+        'hidden_ssid_cache': hidden
+    }
+
+
+class ScannerCheckpoint:
+    def __init__(self, path, interval=CHECKPOINT_INTERVAL):
+        self.path = Path(path)
+        self.interval = interval
+        self.last_saved = 0
+
+    def due(self):
+        """距上次保存是否已超过间隔"""
+        return time.time() - self.last_saved >= self.interval
+
+    def save(self, state):
+        """原子写入快照"""
+        state = dict(state, saved_at=time.time())
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(encode_state(state))
+            os.replace(tmp_path, self.path)
+            self.last_saved = state['saved_at']
+        except (OSError, struct.error, ValueError) as e:
+            logger.warning("保存扫描快照失败: %s", e)
+
+    def load(self):
+        """读取快照，不存在或损坏时返回 None"""
+        try:
+            with open(self.path, 'rb') as f:
+                return decode_state(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("扫描快照不可用: %s", e)
+            return None
